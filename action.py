@@ -1,47 +1,110 @@
+from id_registry import IdRegistry
+
+_ids = IdRegistry()  # the ids of the actions created without one, shared by the process
+
+
+def action_id(name):
+    """
+    Returns the integer id of the action name in the registry of the process, interning the name if it is new.
+    The actions of a parsed domain get their ids from its parser instead (see PgParser.create_action)
+    """
+    return _ids.get(name)
+
+
+def to_mask(propositions):
+    """
+    Returns the bitmask of an iterable of propositions (or of actions), bit i is set iff the element with id i is in it
+    """
+    mask = 0
+    for prop in propositions:
+        mask |= 1 << prop.id
+    return mask
+
+
 class Action(object):
     """
     The action class is used to define operators.
     Each action has a list of preconditions, an "add list" of positive effects,
     a "delete list" for negative effects, and the name of the action.
-    Two actions are considered equal if they have the same name.
+    Two actions are considered equal if they have the same name,
+    which is decided by their interned integer id (see PgParser.create_action, or action_id).
+    The pre, add and delete lists should not be modified in place, assign a new list instead
+    so that the precomputed sets and bitmasks are kept up to date.
     """
+    __slots__ = ('name', 'id', 'noOp', '_pre', '_add', '_delete', 'pre_set', 'add_set', 'delete_set',
+                 'pre_mask', 'add_mask', 'delete_mask')
 
-    def __init__(self, name, pre, add, delete, is_noop=False):
+    def __init__(self, name, pre, add, delete, is_noop=False, act_id=None):
         """
         Constructor
+        act_id is the id of the name in the registry of its domain, by default the one of the process (see action_id)
         """
         self.pre = pre  # list of the precondition propositions
         self.add = add  # list of the propositions that will be added after applying the action
         self.delete = delete  # list of the propositions that will be deleted after applying the action
         self.name = name  # the name of the action as string
+        self.id = act_id if act_id is not None else action_id(name)  # integer id of the name
         self.noOp = is_noop  # true if the action is a noOp
 
+    @property
+    def pre(self):
+        return self._pre
+
+    @pre.setter
+    def pre(self, pre):
+        self._pre = pre
+        self.pre_set = frozenset(pre)
+        self.pre_mask = to_mask(pre)
+
+    @property
+    def add(self):
+        return self._add
+
+    @add.setter
+    def add(self, add):
+        self._add = add
+        self.add_set = frozenset(add)
+        self.add_mask = to_mask(add)
+
+    @property
+    def delete(self):
+        return self._delete
+
+    @delete.setter
+    def delete(self, delete):
+        self._delete = delete
+        self.delete_set = frozenset(delete)
+        self.delete_mask = to_mask(delete)
+
     def get_pre(self):
-        return self.pre
+        return self._pre
 
     def get_add(self):
-        return self.add
+        return self._add
 
     def get_delete(self):
-        return self.delete
+        return self._delete
 
     def get_name(self):
         return self.name
 
+    def get_id(self):
+        return self.id
+
     def is_pre_cond(self, prop):
-        return prop in self.pre
+        return prop in self.pre_set
 
     def is_pos_effect(self, prop):
         """
         True if the proposition prop is a positive effect of the action
         """
-        return prop in self.add
+        return prop in self.add_set
 
     def is_neg_effect(self, prop):
         """
         Returns true if the proposition prop is a negative effect of the action
         """
-        return prop in self.delete
+        return prop in self.delete_set
 
     def all_preconds_in_list(self, propositions):
         """
@@ -49,10 +112,7 @@ class Action(object):
         are in the propositions list / set
         propositions must be iterable
         """
-        for pre in self.pre:
-            if pre not in propositions:
-                return False
-        return True
+        return self.pre_set.issubset(propositions)
 
     def is_noop(self):
         """
@@ -61,8 +121,8 @@ class Action(object):
         return self.noOp
 
     def __eq__(self, other):
-        return (isinstance(other, self.__class__)
-                and self.name == other.name)
+        return self is other or (isinstance(other, self.__class__)
+                                 and self.id == other.id)
 
     def __str__(self):
         return self.name
@@ -74,4 +134,4 @@ class Action(object):
         return self.name < other.name
 
     def __hash__(self):
-        return hash(self.name)
+        return self.id
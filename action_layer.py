@@ -1,10 +1,11 @@
-from util import Pair
+from mutex_set import MutexSet
 
 
 class ActionLayer(object):
     """
     A class for an ActionLayer in a level of the graph.
-    The layer contains a set of actions (action objects) and a set of mutex actions (Pair objects)
+    The layer contains a set of actions (action objects) and a set of mutex actions (a MutexSet of action pairs)
+    It also keeps a producer index, from each proposition to the actions in the layer that have it in their add list
     """
 
     def __init__(self):
@@ -12,13 +13,26 @@ class ActionLayer(object):
         Constructor
         """
         self.actions = set()  # set of all the actions in the layer
-        self.mutexActions = set()  # set of pairs of action that are mutex in the layer
+        self.mutexActions = MutexSet()  # set of pairs of action that are mutex in the layer
+        self.producers = dict()  # Prop: list of the actions in the layer that add it, the noOp (if any) first
 
     def add_action(self, act):  # adds the action act to the actions set
+        if act in self.actions:
+            return
         self.actions.add(act)
+        for prop in act.get_add():
+            producers = self.producers.setdefault(prop, [])
+            if act.is_noop():
+                producers.insert(0, act)
+            else:
+                producers.append(act)
 
     def remove_actions(self, act):  # removes the action act to the actions set
         self.actions.remove(act)
+        for prop in act.get_add():
+            self.producers[prop].remove(act)
+            if not self.producers[prop]:
+                del self.producers[prop]
 
     def get_actions(self):  # returns the actions set
         return self.actions
@@ -27,7 +41,7 @@ class ActionLayer(object):
         return self.mutexActions
 
     def add_mutex_actions(self, a1, a2):  # add the pair (a1,a2) to the mutex actions set
-        self.mutexActions.add(Pair(a1, a2))
+        self.mutexActions.add_mutex(a1, a2)
 
     def is_mutex(self, pair):
         """
@@ -35,14 +49,24 @@ class ActionLayer(object):
         """
         return pair in self.mutexActions
 
+    def are_mutex(self, a1, a2):
+        """
+        Returns true if actions a1 and a2 are mutex in this action layer, without creating a Pair
+        """
+        return self.mutexActions.is_mutex(a1, a2)
+
+    def get_producers(self, prop):
+        """
+        Returns the list of the actions in this layer that have the proposition prop in their add list.
+        The noOp of prop comes first, which is the order in which a backward search usually tries them
+        """
+        return self.producers.get(prop, [])
+
     def effect_exists(self, prop):
         """
         Returns true if at least one of the actions in this layer has the proposition prop in its add list
         """
-        for act in self.actions:
-            if prop in act.get_add():
-                return True
-        return False
+        return prop in self.producers
 
     def __eq__(self, other):
         return (isinstance(other, self.__class__)
@@ -0,0 +1,163 @@
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from benchmark import HEURISTICS, SOLVERS
+from domain_cache import DomainCache
+from domain_context import DomainContext
+from graph_plan import GraphPlan
+from pgparser import LiftedDomainError
+from planning_problem import PlanningProblem
+from search import budgeted_search
+from budget import add_budget_arguments, budget_from_args
+from util import TimeoutFunction, TimeoutFunctionException
+
+_context = None  # the DomainContext of the domain of the batch in a worker, see init_worker
+
+
+def list_problems(path, domain_file=None):
+    """
+    Returns the problem files of path: the files of a directory (but the domain file) in sorted order,
+    or the files listed in a manifest file, one per line (relative to the manifest, '#' starts a comment)
+    """
+    if os.path.isdir(path):
+        skip = os.path.abspath(domain_file) if domain_file is not None else None
+        return [os.path.join(path, name) for name in sorted(os.listdir(path))
+                if os.path.isfile(os.path.join(path, name)) and os.path.abspath(os.path.join(path, name)) != skip]
+    problems = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                problems.append(os.path.join(os.path.dirname(path), line))
+    return problems
+
+
+def load_context(domain_file, cache_dir=None):
+    """
+    Returns the DomainContext of domain_file, or None for a lifted domain, which is grounded with each problem.
+    Any other error of the domain is raised, since every problem of the batch would fail with it
+    """
+    try:
+        return DomainContext.load(domain_file, DomainCache(cache_dir or None) if cache_dir is not None else None)
+    except LiftedDomainError:
+        return None
+
+
+def init_worker(domain_file, cache_dir):
+    """
+    Sets the context of the worker. A forked worker inherits the context of the parent (copy on write),
+    a spawned one loads it (from the domain cache if any)
+    """
+    global _context
+    if _context is None:
+        _context = load_context(domain_file, cache_dir)
+
+
+def solve(domain_file, problem_file, solver, expansion='full', extraction='first', budget=None):
+    """
+    Solves a problem with the solver (see benchmark.SOLVERS) and the context of the worker under budget,
+    and returns the dict of its SolveResult
+    """
+    if solver == 'graphplan':
+        gp = GraphPlan(domain_file, problem_file, expansion=expansion, extraction=extraction, context=_context)
+        result = gp.solve(budget)
+    else:
+        prob = PlanningProblem(domain_file, problem_file, context=_context)
+        result = budgeted_search(prob, HEURISTICS[solver[len('astar-'):]], budget)
+    return result.to_dict()
+
+
+def run_task(domain_file, problem_file, solver, budget, expansion, extraction):
+    """
+    The task of a worker: returns the result dict of a problem, solved under budget (a Budget or None).
+    The budget is checked by the solver, which stops with what it found when it runs out.
+    A search can only check it between two levels of the graph or two search nodes, so a time limit
+    is also enforced by a SIGALRM of the worker process, a second (or a tenth of the limit) later,
+    which loses what was found but leaves the worker usable
+    """
+    start = time.perf_counter()
+    result = {'problem': problem_file, 'solver': solver}
+    try:
+        if budget is not None and budget.time_limit:
+            timeout = budget.time_limit + max(1.0, budget.time_limit / 10)
+            result.update(TimeoutFunction(solve, timeout)(domain_file, problem_file, solver, expansion, extraction,
+                                                          budget))
+        else:
+            result.update(solve(domain_file, problem_file, solver, expansion, extraction, budget))
+    except TimeoutFunctionException:
+        result['status'] = 'exhausted'
+        result['reason'] = 'time'
+    except Exception as e:  # reported in the result, the other problems of the batch go on
+        result['status'] = 'error'
+        result['error'] = '%s: %s' % (type(e).__name__, e)
+    result['time'] = time.perf_counter() - start
+    return result
+
+
+def run_batch(domain_file, problems, solver='graphplan', workers=None, budget=None, expansion='full',
+              extraction='first', cache_dir=None, output=sys.stdout):
+    """
+    Solves the problems of a domain in a pool of worker processes, and writes the result of each one to output
+    as a JSON line as soon as it is done (so in the order they finish, 'index' is the position in problems).
+    The domain is parsed and compiled (noOps and independent actions) once in this process,
+    and the workers are forked so that they share it, where fork is available.
+    Each problem is solved under its own copy of budget (see run_task).
+    Returns the counts of the statuses of the results
+    """
+    global _context
+    _context = load_context(domain_file, cache_dir)
+    methods = multiprocessing.get_all_start_methods()
+    mp_context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    statuses = dict()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context, initializer=init_worker,
+                             initargs=(domain_file, cache_dir)) as executor:
+        futures = {executor.submit(run_task, domain_file, problem_file, solver, budget, expansion, extraction): i
+                   for i, problem_file in enumerate(problems)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # the worker died
+                result = {'problem': problems[i], 'solver': solver, 'status': 'error',
+                          'error': '%s: %s' % (type(e).__name__, e)}
+            result['index'] = i
+            statuses[result['status']] = statuses.get(result['status'], 0) + 1
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+    return statuses
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Solves many problems of one domain in parallel, "
+                                                 "and writes a JSON line per problem")
+    parser.add_argument('domain', help="domain file")
+    parser.add_argument('problems', help="a directory of problem files, or a manifest file listing them")
+    parser.add_argument('--solver', choices=SOLVERS, default='graphplan', help="(default: %(default)s)")
+    parser.add_argument('--workers', type=int, help="worker processes (default: the number of CPUs)")
+    parser.add_argument('--expansion', choices=GraphPlan.expansions, default='full',
+                        help="how graphplan expands the levels of the graph (default: %(default)s)")
+    parser.add_argument('--extraction', choices=GraphPlan.extractions, default='first',
+                        help="how graphplan extracts a plan from the graph (default: %(default)s)")
+    parser.add_argument('--domain-cache', nargs='?', const='', metavar='DIR',
+                        help="load the compiled domain from the cache in DIR (default: ~/.cache/graphplan)")
+    parser.add_argument('--output', help="write the JSON lines to this file instead of the standard output")
+    add_budget_arguments(parser)
+    args = parser.parse_args()
+
+    problem_files = list_problems(args.problems, args.domain)
+    batch_start = time.time()
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        counts = run_batch(args.domain, problem_files, args.solver, args.workers, budget_from_args(args),
+                           args.expansion, args.extraction, args.domain_cache, out)
+    finally:
+        if args.output:
+            out.close()
+    summary = ', '.join('%d %s' % (n, status) for status, n in sorted(counts.items()))
+    print("%d problems in %.2f seconds: %s" % (len(problem_files), time.time() - batch_start, summary), file=sys.stderr)
@@ -0,0 +1,144 @@
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import hanoi
+from graph_plan import GraphPlan
+from planning_problem import PlanningProblem, max_level, level_sum, additive_cost, ff_heuristic, null_heuristic
+from search import SearchStatistics, a_star_search
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEURISTICS = {'max': max_level, 'sum': level_sum, 'add': additive_cost, 'ff': ff_heuristic, 'zero': null_heuristic}
+SOLVERS = ('graphplan',) + tuple('astar-' + name for name in HEURISTICS)
+DEFAULT_SIZES = ((2, 3), (3, 3), (3, 4), (4, 3), (4, 4))
+
+
+def create_benchmarks(directory, sizes):
+    """
+    Returns a list of (name, domain file, problem file): DWR and a Hanoi instance of each (disks, pegs) size,
+    written to directory
+    """
+    benchmarks = [('dwr', os.path.join(HERE, 'dwrDomain.txt'), os.path.join(HERE, 'dwrProblem.txt'))]
+    for n, m in sizes:
+        domain_file = os.path.join(directory, 'hanoi_%d_%d_domain.txt' % (n, m))
+        problem_file = os.path.join(directory, 'hanoi_%d_%d_problem.txt' % (n, m))
+        hanoi.create_lifted_domain_file(domain_file, n, m)
+        hanoi.create_problem_file(problem_file, n, m)
+        benchmarks.append(('hanoi_%d_%d' % (n, m), domain_file, problem_file))
+    return benchmarks
+
+
+def solve(solver, domain_file, problem_file):
+    """
+    Solves the problem once with the solver (see SOLVERS), and returns a dict of its counters
+    """
+    if solver == 'graphplan':
+        gp = GraphPlan(domain_file, problem_file, extraction='first')
+        plan = gp.graph_plan()
+        return {'plan_length': len([act for act in plan if not act.is_noop()]) if plan is not None else None,
+                'expanded': gp.extraction_stats['nodes'],
+                'levels': len(gp.graph) - 1}
+    prob = PlanningProblem(domain_file, problem_file)
+    search_statistics = SearchStatistics()
+    plan = a_star_search(prob, HEURISTICS[solver[len('astar-'):]], search_statistics)
+    return {'plan_length': len(plan) if plan is not None else None,
+            'expanded': search_statistics.expanded,
+            'levels': None}
+
+
+def run(benchmarks, solvers, repeats):
+    """
+    Runs every solver on every benchmark, and returns a list of result dicts.
+    Each run is repeated, the times are measured without tracing, and the peak memory
+    is measured by tracemalloc on one more run (tracing slows the run down)
+    """
+    results = []
+    for name, domain_file, problem_file in benchmarks:
+        for solver in solvers:
+            times = []
+            counters = None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                counters = solve(solver, domain_file, problem_file)
+                times.append(time.perf_counter() - start)
+            tracemalloc.start()
+            solve(solver, domain_file, problem_file)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result = {'benchmark': name, 'solver': solver, 'time': statistics.median(times), 'times': times,
+                      'peak_memory': peak}
+            result.update(counters)
+            results.append(result)
+            print("%-12s %-10s %8.4fs %10d bytes  expanded %-6s levels %-4s plan %s" %
+                  (name, solver, result['time'], peak, result['expanded'], result['levels'], result['plan_length']),
+                  file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns the regressions of results against baseline (both lists of result dicts), as a list of strings:
+    a run slower than the baseline by more than tolerance (a fraction), or with a longer plan,
+    more expanded nodes or more levels
+    """
+    baseline_results = {(result['benchmark'], result['solver']): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = baseline_results.get((result['benchmark'], result['solver']))
+        if old is None:
+            continue
+        key = '%s %s' % (result['benchmark'], result['solver'])
+        if result['time'] > old['time'] * (1 + tolerance):
+            regressions.append("%s: time %.4fs, baseline %.4fs (+%.0f%%)" %
+                               (key, result['time'], old['time'], 100 * (result['time'] / old['time'] - 1)))
+        for counter in ('plan_length', 'expanded', 'levels'):
+            if result[counter] is not None and old[counter] is not None and result[counter] > old[counter]:
+                regressions.append("%s: %s %d, baseline %d" % (key, counter, result[counter], old[counter]))
+    return regressions
+
+
+def parse_sizes(text):
+    """
+    Returns the (disks, pegs) sizes of a "3x3,4x3" string
+    """
+    return [tuple(int(value) for value in size.split('x')) for size in text.split(',') if size]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmarks graphplan and A* on DWR and Hanoi instances")
+    parser.add_argument('--sizes', type=parse_sizes, default=list(DEFAULT_SIZES),
+                        help="the Hanoi instances, as disksxpegs separated by commas (default: 2x3,3x3,3x4,4x3,4x4)")
+    parser.add_argument('--solvers', type=lambda text: text.split(','), default=list(SOLVERS),
+                        help="the solvers separated by commas, among %s (default: all)" % ', '.join(SOLVERS))
+    parser.add_argument('--repeats', type=int, default=3, help="timed runs of each benchmark (default: %(default)s)")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', metavar='BASELINE', help="flag the regressions against this JSON results file")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="the fraction of the baseline time a run may exceed (default: %(default)s)")
+    args = parser.parse_args()
+
+    unknown = [solver for solver in args.solvers if solver not in SOLVERS]
+    if unknown:
+        parser.error("unknown solvers %s" % ', '.join(unknown))
+    with tempfile.TemporaryDirectory() as benchmark_dir:
+        run_results = run(create_benchmarks(benchmark_dir, args.sizes), args.solvers, args.repeats)
+    report = {'python': platform.python_version(), 'platform': platform.platform(), 'repeats': args.repeats,
+              'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': run_results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            found = compare(run_results, json.load(f)['results'], args.tolerance)
+        for regression in found:
+            print("REGRESSION " + regression)
+        if found:
+            sys.exit(1)
+        print("No regression against %s" % args.compare)
@@ -0,0 +1,142 @@
+import os
+import time
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def memory_usage():
+    """
+    Returns the resident memory of the process in bytes: the current one read from /proc on Linux,
+    otherwise the peak one from getrusage, or 0 if neither is available
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024  # bytes on macOS, kilobytes elsewhere
+    return 0
+
+
+class Budget(object):
+    """
+    Limits on a solve: wall clock seconds, search nodes and resident memory bytes (None for no limit).
+    The solvers check it cooperatively (see GraphPlan.solve and search.budgeted_search): they charge it
+    for each search node and stop, keeping what they found, once charge returns false.
+    Unlike util.TimeoutFunction it needs no signal, so it works in any thread, and the time limit is not rounded.
+    The memory is read on the first charge and then every memory_interval nodes, since it is a system call.
+    A budget is started by the solver, and used for a single solve at a time
+    """
+
+    reasons = ('time', 'nodes', 'memory')  # the values of exhausted, the limit that ran out
+
+    def __init__(self, time_limit=None, node_limit=None, memory_limit=None, memory_interval=1000):
+        """
+        Constructor
+        """
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.memory_limit = memory_limit
+        self.memory_interval = memory_interval
+        self.start_time = time.perf_counter()
+        self.nodes = 0  # nodes charged since start
+        self.next_memory_check = 0  # the memory is read once nodes reaches it
+        self.exhausted = None  # the reason the budget ran out, see reasons
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.nodes = 0
+        self.next_memory_check = 0
+        self.exhausted = None
+        return self
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def charge(self, nodes=1):
+        """
+        Counts nodes search nodes, and returns true if the budget has not run out
+        (once it has, the nodes are no longer counted)
+        """
+        if self.exhausted is not None:
+            return False
+        self.nodes += nodes
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            self.exhausted = 'nodes'
+        elif self.time_limit is not None and time.perf_counter() - self.start_time > self.time_limit:
+            self.exhausted = 'time'
+        elif self.memory_limit is not None and self.nodes >= self.next_memory_check:
+            self.next_memory_check = self.nodes + self.memory_interval
+            if memory_usage() > self.memory_limit:
+                self.exhausted = 'memory'
+        return self.exhausted is None
+
+    def check(self):
+        """
+        Returns true if the budget has not run out, without charging a node (the memory is always read)
+        """
+        if self.exhausted is None and self.memory_limit is not None and memory_usage() > self.memory_limit:
+            self.exhausted = 'memory'
+        return self.charge(0)
+
+
+class SolveResult(object):
+    """
+    The outcome of a solve under a Budget:
+    status is 'solved' (plan is a plan), 'unsolvable' (proved), or 'exhausted' (the budget ran out, see reason),
+    plan is the best plan found (it may be one found before the budget ran out, then not the best possible),
+    bound is a lower bound on the cost of a plan when the solver has one (None otherwise),
+    statistics is a dict of the counters of the solver
+    """
+
+    def __init__(self, status, plan=None, bound=None, reason=None, statistics=None):
+        """
+        Constructor
+        """
+        self.status = status
+        self.plan = plan
+        self.bound = bound
+        self.reason = reason
+        self.statistics = statistics if statistics is not None else dict()
+
+    def to_dict(self):
+        return {'status': self.status,
+                'reason': self.reason,
+                'plan': [action.get_name() for action in self.plan] if self.plan is not None else None,
+                'plan_length': len(self.plan) if self.plan is not None else None,
+                'bound': self.bound,
+                'statistics': self.statistics}
+
+    def __str__(self):
+        if self.status == 'exhausted':
+            return "Ran out of %s budget, %s, lower bound %s" % (
+                self.reason, "plan of %d actions found" % len(self.plan) if self.plan is not None else "no plan",
+                self.bound)
+        return self.status
+
+
+def add_budget_arguments(parser):
+    """
+    Adds the --time-limit, --node-limit and --memory-limit options of a Budget to an argparse parser
+    """
+    parser.add_argument('--time-limit', type=float, metavar='SECONDS', help="stop the search after SECONDS")
+    parser.add_argument('--node-limit', type=int, metavar='NODES', help="stop the search after NODES search nodes")
+    parser.add_argument('--memory-limit', type=float, metavar='MB',
+                        help="stop the search when the process uses more than MB megabytes")
+
+
+def budget_from_args(args):
+    """
+    Returns the Budget of the options added by add_budget_arguments, or None if no limit is given
+    """
+    if args.time_limit is None and args.node_limit is None and args.memory_limit is None:
+        return None
+    memory_limit = int(args.memory_limit * 1024 * 1024) if args.memory_limit is not None else None
+    return Budget(args.time_limit, args.node_limit, memory_limit)
@@ -0,0 +1,311 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+from action import Action
+from independent_actions import IndependentActions
+from pgparser import PgParser, LiftedDomainError
+
+MAGIC = b'PGDC'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sII')  # magic, format version, length of the JSON table
+ALIGNMENT = 8
+
+
+def default_cache_dir():
+    return os.environ.get('GRAPHPLAN_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'graphplan'))
+
+
+def domain_hash(domain_file):
+    """
+    Returns the hex digest of the content of a domain file (as stored, compressed or not)
+    """
+    digest = hashlib.sha256()
+    with open(domain_file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DomainCache(object):
+    """
+    An on-disk cache of compiled domains, keyed by the content hash of the domain file.
+    Hashing a large domain is not free, so the hash of a file is also remembered under its
+    (absolute path, size, modification time) stamp, and a file whose stamp is known is not read again.
+    A compiled domain is a single binary file: a JSON table of the proposition and action names,
+    followed by the pre, add and delete lists of the actions as int32 index arrays (offsets and items),
+    and by the interference bitsets of the actions and their noOps (see IndependentActions),
+    one fixed size little endian row per action.
+    The file is memory mapped when loaded, so a warm start only creates the proposition and action objects,
+    and an interference row is only read when it is first used.
+    Lifted domains (see grounder.py) are grounded per problem, loading one raises a LiftedDomainError
+    (see load_grounded).
+    """
+
+    def __init__(self, cache_dir=None):
+        """
+        Constructor
+        """
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.hits = 0
+        self.misses = 0
+        self.hashes = dict()  # stamp: content hash, the stamps seen by this cache
+
+    def get_hash(self, domain_file):
+        """
+        Returns the content hash of domain_file, read from the stamp of the file when it is known
+        """
+        stat = os.stat(domain_file)
+        stamp = '%s\0%d\0%d' % (os.path.abspath(domain_file), stat.st_size, stat.st_mtime_ns)
+        content_hash = self.hashes.get(stamp)
+        if content_hash is not None:
+            return content_hash
+        stamp_path = os.path.join(self.cache_dir, 'stamps', hashlib.sha256(stamp.encode('utf-8')).hexdigest())
+        try:
+            with open(stamp_path, 'r') as f:
+                content_hash = f.read().strip()
+        except OSError:
+            content_hash = domain_hash(domain_file)
+            write_atomically(stamp_path, content_hash.encode('ascii'))
+        self.hashes[stamp] = content_hash
+        return content_hash
+
+    def get_path(self, domain_file):
+        return os.path.join(self.cache_dir, self.get_hash(domain_file) + '.pgdc')
+
+    def load(self, domain_file):
+        """
+        Returns the CompiledDomain of domain_file, compiling it and storing it first if it is not in the cache.
+        The caller closes it (or uses it in a with statement) once the actions and their independence are not needed
+        """
+        path = self.get_path(domain_file)
+        if os.path.exists(path):
+            try:
+                compiled = CompiledDomain(path)
+                self.hits += 1
+                return compiled
+            except ValueError:
+                pass  # written by another version, compile it again
+        self.misses += 1
+        self.compile(domain_file, path)
+        return CompiledDomain(path)
+
+    def load_grounded(self, domain_file):
+        """
+        Returns the CompiledDomain of domain_file as load does, or None if it is a lifted domain,
+        which the caller parses with its problem instead
+        """
+        try:
+            return self.load(domain_file)
+        except LiftedDomainError:
+            return None
+
+    def compile(self, domain_file, path):
+        """
+        Parses domain_file and writes its compiled form to path
+        """
+        parser = PgParser(domain_file, None)
+        actions, propositions = parser.parse_actions_and_propositions()
+        write_compiled(path, actions, propositions, parser)
+
+
+def write_atomically(path, data):
+    """
+    Writes data to path through a temporary file, so that readers never see a partially written file
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    umask = os.umask(0)  # mkstemp creates the file readable by its owner only, give it the mode of a new file
+    os.umask(umask)
+    os.chmod(temp_path, 0o666 & ~umask)
+    os.replace(temp_path, path)
+
+
+def write_compiled(path, actions, propositions, parser):
+    """
+    Writes the compiled form of a domain parsed by parser to path (see DomainCache).
+    The interference rows are over the actions followed by one noOp per proposition, in the order of propositions
+    (as created by GraphPlan.create_noops and PlanningProblem.create_noops)
+    """
+    prop_index = {prop.id: j for j, prop in enumerate(propositions)}
+    all_actions = actions + [parser.create_noop(prop) for prop in propositions]
+    independent_actions = IndependentActions(all_actions)
+    action_index = {action.id: i for i, action in enumerate(all_actions)}
+    row_bytes = (len(all_actions) + 7) // 8
+
+    arrays = []
+    for get_list in (Action.get_pre, Action.get_add, Action.get_delete):
+        offsets, items = array('i', [0]), array('i')
+        for action in actions:
+            items.extend(prop_index[prop.id] for prop in get_list(action))
+            offsets.append(len(items))
+        arrays += [offsets, items]
+
+    table = {'propositions': [prop.name for prop in propositions],
+             'actions': [action.name for action in actions],
+             'row_bytes': row_bytes}
+    table_bytes = json.dumps(table).encode('utf-8')
+    data = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, len(table_bytes)))
+    data += table_bytes
+    for values in arrays:
+        data += b'\0' * (-len(data) % ALIGNMENT)
+        data += values.tobytes()
+    data += b'\0' * (-len(data) % ALIGNMENT)
+    for action in all_actions:
+        row = 0
+        mask = independent_actions.get_mask(action)
+        while mask:
+            low_bit = mask & -mask
+            other = action_index.get(low_bit.bit_length() - 1)
+            if other is not None:
+                row |= 1 << other
+            mask ^= low_bit
+        data += row.to_bytes(row_bytes, 'little')
+    write_atomically(path, data)
+
+
+class CompiledDomain(object):
+    """
+    A compiled domain loaded from a DomainCache file.
+    It keeps the file memory mapped until close() (also called at the end of a with statement),
+    the IndependentActions read from it can not be used after that
+    """
+
+    def __init__(self, path):
+        """
+        Constructor
+        Raises ValueError if the file is not a compiled domain of this format version
+        """
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index_arrays = []
+        magic, version, table_length = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError("%s is not a compiled domain of version %d" % (path, FORMAT_VERSION))
+        offset = HEADER.size
+        table = json.loads(self.buffer[offset:offset + table_length].decode('utf-8'))
+        offset += table_length
+        self.proposition_names = table['propositions']
+        self.action_names = table['actions']
+        self.row_bytes = table['row_bytes']
+
+        arrays = []
+        view = memoryview(self.buffer)
+        for length in (len(self.action_names) + 1, None) * 3:
+            offset += -offset % ALIGNMENT
+            if length is None:
+                length = arrays[-1][-1]  # the items of the last offsets array
+            arrays.append(view[offset:offset + 4 * length].cast('i'))
+            offset += 4 * length
+        self.rows_offset = offset + (-offset % ALIGNMENT)
+        self.index_arrays = arrays  # pre offsets, pre items, add offsets, add items, delete offsets, delete items
+
+    def create(self, parser):
+        """
+        Returns [actions, propositions], as PgParser.parse_actions_and_propositions does,
+        with the propositions created through parser (so that the problem is parsed into the same objects)
+        """
+        propositions = [parser.get_proposition(name) for name in self.proposition_names]
+        pre_offsets, pre_items, add_offsets, add_items, delete_offsets, delete_items = self.index_arrays
+        actions = []
+        for i, name in enumerate(self.action_names):
+            pre = [propositions[j] for j in pre_items[pre_offsets[i]:pre_offsets[i + 1]]]
+            add = [propositions[j] for j in add_items[add_offsets[i]:add_offsets[i + 1]]]
+            delete = [propositions[j] for j in delete_items[delete_offsets[i]:delete_offsets[i + 1]]]
+            actions.append(parser.create_action(name, pre, add, delete))
+        return [actions, propositions]
+
+    def independent_actions(self, actions):
+        """
+        Returns the IndependentActions of actions, which must be the actions returned by create
+        followed by their noOps (in the order of the propositions), read from the interference rows
+        """
+        if len(actions) != len(self.action_names) + len(self.proposition_names):
+            raise ValueError("expected %d actions and noOps, got %d" %
+                             (len(self.action_names) + len(self.proposition_names), len(actions)))
+        return MappedIndependentActions(self, actions)
+
+    def read_row(self, i):
+        """
+        Returns the interference row of the action of index i, a bitset over the action indices
+        """
+        start = self.rows_offset + i * self.row_bytes
+        return int.from_bytes(self.buffer[start:start + self.row_bytes], 'little')
+
+    def close(self):
+        """
+        Unmaps the file
+        """
+        for values in self.index_arrays:
+            values.release()
+        self.index_arrays = []
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class MappedIndependentActions(IndependentActions):
+    """
+    IndependentActions whose interference bitsets are read from a CompiledDomain when first used
+    """
+
+    def __init__(self, compiled, actions):
+        """
+        Constructor
+        """
+        IndependentActions.__init__(self)
+        self.compiled = compiled
+        self.index = dict()  # action id: index of its row
+        for i, action in enumerate(actions):
+            self.actions[action.id] = action
+            self.index[action.id] = i
+        ids = [action.id for action in actions]
+        # the rows are over the action indices, when the ids are consecutive shifting a row maps it to the ids
+        self.shift = ids[0] if ids and ids == list(range(ids[0], ids[0] + len(ids))) else None
+        self.ids = ids
+
+    def get_mask(self, action):
+        row = self.rows.get(action.id)
+        if row is None:
+            i = self.index.get(action.id)
+            if i is None:
+                return 0
+            row = self.to_ids(self.compiled.read_row(i))
+            self.rows[action.id] = row
+        return row
+
+    def to_ids(self, row):
+        if self.shift is not None:
+            return row << self.shift
+        mask = 0
+        while row:
+            low_bit = row & -row
+            mask |= 1 << self.ids[low_bit.bit_length() - 1]
+            row ^= low_bit
+        return mask
+
+    def interfere(self, a1, a2):
+        return self.get_mask(a1) >> a2.id & 1 == 1
+
+    def materialize(self):
+        """
+        Reads every interference row that has not been read yet, after which the compiled domain can be closed
+        """
+        for action in self.actions.values():
+            self.get_mask(action)
+
+    def __len__(self):
+        self.materialize()
+        return IndependentActions.__len__(self)
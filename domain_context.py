@@ -0,0 +1,53 @@
+from typing import NamedTuple, Tuple
+
+from action import Action
+from independent_actions import IndependentActions
+from pgparser import PgParser
+from proposition import Proposition
+
+
+class DomainContext(NamedTuple):
+    """
+    The read-only data of a grounded domain that the expansion of the planning graph needs:
+    its actions (noOps included), its propositions and the interference of its actions.
+    A context is immutable and is passed to the levels of the graph (see PlanGraphLevel) instead of being
+    stored in class attributes, so several problems of the same or of different domains can be solved
+    at the same time, in threads of one process, and a context can be shared by all of them
+    (see GraphPlan and PlanningProblem, which take one instead of parsing the domain)
+    """
+    actions: Tuple[Action, ...]
+    propositions: Tuple[Proposition, ...]
+    independent_actions: IndependentActions
+
+    @staticmethod
+    def load(domain_file, domain_cache=None):
+        """
+        Returns the context of a domain file, parsed or loaded from the DomainCache domain_cache.
+        The interference rows of a compiled domain are all read before its file is unmapped, so that the context
+        does not change once created. Lifted domains are grounded per problem, loading one raises a LiftedDomainError
+        """
+        parser = PgParser(domain_file, None)
+        if domain_cache is not None:
+            with domain_cache.load(domain_file) as compiled:
+                actions, propositions = compiled.create(parser)
+                actions += create_noops(parser, propositions)
+                independent_actions = compiled.independent_actions(actions)
+                independent_actions.materialize()
+        else:
+            actions, propositions = parser.parse_actions_and_propositions()
+            actions += create_noops(parser, propositions)
+            independent_actions = IndependentActions(actions)
+        return DomainContext(tuple(actions), tuple(propositions), independent_actions)
+
+
+def create_noops(parser, propositions):
+    """
+    Returns the noOps of the propositions, in their order, each one added to the producers of its proposition,
+    with ids from the registry of the actions of parser
+    """
+    noops = []
+    for prop in propositions:
+        noop = parser.create_noop(prop)
+        prop.add_producer(noop)
+        noops.append(noop)
+    return noops
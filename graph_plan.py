@@ -1,10 +1,16 @@
-import itertools
+import time
 
-from util import Pair
 from proposition_layer import PropositionLayer
 from plan_graph_level import PlanGraphLevel
+from leveled_graph import LeveledGraph
 from action import Action
 from pgparser import PgParser
+from no_goods import NoGoodStore
+from independent_actions import IndependentActions
+from domain_cache import DomainCache
+from domain_context import DomainContext
+from instrumentation import Instrumentation, profile_call
+from budget import SolveResult, add_budget_arguments, budget_from_args
 
 
 class GraphPlan(object):
@@ -12,47 +18,138 @@ class GraphPlan(object):
     A class for initializing and running the graphplan algorithm
     """
 
-    def __init__(self, _domain, _problem):
+    expansions = ('full', 'incremental', 'leveled', 'numpy')  # the ways to expand a level of the graph, see next_level
+    extractions = ('exhaustive', 'first', 'bounded')  # the ways to extract a plan from the graph, see gp_search
+
+    def __init__(self, _domain, _problem, expansion='full', extraction='exhaustive', node_budget=100000,
+                 domain_cache=None, instrumentation=None, context=None):
         """
         Constructor
+        expansion is 'full' to compute every level from scratch (PlanGraphLevel.expand),
+        'incremental' to carry the previous level forward (PlanGraphLevel.expand_incremental),
+        'leveled' to store the whole graph once in a LeveledGraph, and keep views of its levels in self.graph,
+        or 'numpy' to hold each level as NumPy boolean arrays (see NumpyLevel, requires NumPy)
+        extraction is 'exhaustive' to extract the plan with the fewest actions (noOps included) at the level,
+        'first' to extract the first plan found (the standard graphplan behavior),
+        or 'bounded' to extract the best plan found within node_budget search nodes,
+        and then the first plan found if the budget runs out
+        domain_cache is a DomainCache to load the domain and its independent actions from, instead of parsing it
+        instrumentation is an Instrumentation to record the levels and the extraction tries in (see instrumentation.py)
+        context is a DomainContext of the domain (see DomainContext.load) to use instead of reading _domain,
+        the same context can be shared by several GraphPlan objects, also in different threads
         """
-        self.independent_actions = set()
-        self.no_goods = []
+        if expansion not in GraphPlan.expansions:
+            raise ValueError("expansion must be one of %s, got %r" % (GraphPlan.expansions, expansion))
+        if extraction not in GraphPlan.extractions:
+            raise ValueError("extraction must be one of %s, got %r" % (GraphPlan.extractions, extraction))
+        self.expansion = expansion
+        self.extraction = extraction
+        self.node_budget = node_budget
+        self.attempt_nodes = 0  # search nodes of the current extraction attempt, for the node budget
+        self.extraction_stats = dict()
+        self.independent_actions = IndependentActions()
+        self.no_goods = NoGoodStore()
         self.graph = []
-        p = PgParser(_domain, _problem)
-        self.actions, self.propositions = p.parse_actions_and_propositions()
+        self.leveled_graph = None  # the LeveledGraph behind self.graph when expansion is 'leveled'
+        self.domain_matrices = None  # the DomainMatrices of the actions when expansion is 'numpy'
+        self.compiled_domain = None  # the CompiledDomain the domain was loaded from, see close
+        self.instrumentation = instrumentation
+        self.budget = None  # the Budget of the running search, see graph_plan
+        self.fixed_level = None  # the level at which the graph has leveled off, once it has, see is_fixed
+        self.lower_bound = 0
+        p = PgParser(_domain, _problem, context.propositions if context is not None else None)
+        if context is not None:
+            self.actions, self.propositions = list(context.actions), list(context.propositions)
+        elif domain_cache is not None:
+            start = time.time()
+            self.compiled_domain = domain_cache.load_grounded(_domain)
+            if self.compiled_domain is not None:
+                self.actions, self.propositions = self.compiled_domain.create(p)
+                p.parse_time += time.time() - start  # loading the compiled domain replaces parsing it
+            else:  # a lifted domain is grounded with the problem
+                self.actions, self.propositions = p.parse_actions_and_propositions()
+        else:
+            self.actions, self.propositions = p.parse_actions_and_propositions()
         # list of all the actions and list of all the propositions
 
         self.initial_state, self.goal = p.parse_problem()
         # the initial state and the goal state are lists of propositions
+        self.parse_time = p.parse_time  # seconds spent reading the domain and problem files
 
-        self.create_noops()
-        # creates noOps that are used to propagate existing propositions from one layer to the next
-
-        self.independent()
-        # creates independent actions set and updates self.independent_actions
-        PlanGraphLevel.set_independent_actions(self.independent_actions)
-        PlanGraphLevel.set_actions(self.actions)
-        PlanGraphLevel.set_props(self.propositions)
+        if context is None:
+            self.create_noops(p)
+            # creates noOps that are used to propagate existing propositions from one layer to the next
 
-    def graph_plan(self):
+            if self.compiled_domain is not None:
+                self.independent_actions = self.compiled_domain.independent_actions(self.actions)
+            else:
+                self.independent()
+            # creates independent actions set and updates self.independent_actions
+            context = DomainContext(tuple(self.actions), tuple(self.propositions), self.independent_actions)
+        else:
+            self.independent_actions = context.independent_actions
+        self.context = context  # the domain, read by the levels of the graph
+
+    def solve(self, budget=None):
+        """
+        Runs graphplan under a Budget (see budget.py), and returns a SolveResult.
+        The nodes of the budget are the gp_search nodes. When the budget runs out the result has the plan found
+        by the extraction that was stopped, if any (the exhaustive and bounded extractions may have found one
+        before finishing), and the bound is the least number of levels (parallel steps) of a plan
+        """
+        start = time.time()
+        plan = self.graph_plan(budget)
+        exhausted = budget.exhausted if budget is not None else None
+        if exhausted is not None and (plan is None or self.extraction != 'first'):
+            status = 'exhausted'
+        else:
+            status = 'solved' if plan is not None else 'unsolvable'
+        statistics = {'elapsed': time.time() - start, 'levels': len(self.graph) - 1,
+                      'no_good_hits': self.no_goods.hits, 'no_good_misses': self.no_goods.misses}
+        statistics.update(self.extraction_stats)
+        if plan is not None:
+            plan = [act for act in plan if not act.is_noop()]
+        return SolveResult(status, plan, self.lower_bound, exhausted, statistics)
+
+    def graph_plan(self, budget=None):
         """
         The graphplan algorithm.
         The code calls the extract function which you should complete below
+        If a Budget is given, it is checked before each level is expanded and charged for each gp_search node,
+        and None (or the plan found by the stopped extraction) is returned when it runs out, see solve
         """
         # initialization
         init_state = self.initial_state
         level = 0
-        self.no_goods = []  # make sure you update noGoods in your backward search!
-        self.no_goods.append([])
+        self.budget = budget.start() if budget is not None else None
+        self.lower_bound = 0  # the least number of levels of a plan, see solve
+        self.no_goods = NoGoodStore()  # make sure you update noGoods in your backward search!
+        self.no_goods.add_level()
+        self.extraction_stats = {'nodes': 0, 'attempts': 0, 'budget_exhausted': 0}
+        # a run starts from an empty graph, a retry must not reuse the levels (nor fixed_level) of the previous one
+        self.graph = []
+        self.leveled_graph = None
+        self.domain_matrices = None
         # create first layer of the graph, note it only has a proposition layer which consists of the initial state.
-        prop_layer_init = PropositionLayer()
-        for prop in init_state:
-            prop_layer_init.add_proposition(prop)
-        pg_init = PlanGraphLevel()
-        pg_init.set_proposition_layer(prop_layer_init)
+        if self.expansion == 'leveled':
+            self.leveled_graph = LeveledGraph(self.context, init_state)
+            pg_init = self.leveled_graph.get_level(0)
+        elif self.expansion == 'numpy':
+            from numpy_expansion import DomainMatrices, NumpyLevel
+            if self.domain_matrices is None:
+                self.domain_matrices = DomainMatrices(self.actions)
+            pg_init = NumpyLevel.initial(self.domain_matrices, init_state)
+        else:
+            prop_layer_init = PropositionLayer()
+            for prop in init_state:
+                prop_layer_init.add_proposition(prop)
+            pg_init = PlanGraphLevel(self.context)
+            pg_init.set_proposition_layer(prop_layer_init)
         self.graph.append(pg_init)
-        size_no_good = -1
+        if self.instrumentation is not None:
+            self.instrumentation.record_level(pg_init, dict(), 0.0)
+        self.fixed_level = None
+        stable_size_no_good = -1  # the no-goods of the level-off level after the last failed extraction
 
         """
         While the layer does not contain all of the propositions in the goal state,
@@ -64,35 +161,106 @@ class GraphPlan(object):
                 self.goal_state_has_mutex(self.graph[level].get_proposition_layer()):
             if self.is_fixed(level):
                 return None
-                # this means we stopped the while loop above because we reached a fixed point in the graph.
+                # this means we stopped the while loop above because the graph has leveled off.
                 #  nothing more to do, we failed!
+            self.lower_bound = level + 1
+            if self.out_of_budget(check=True):
+                return None
 
-            self.no_goods.append([])
+            self.no_goods.add_level()
             level = level + 1
-            pg_next = PlanGraphLevel()  # create new PlanGraph object
-            pg_next.expand(
-                self.graph[level - 1])  # calls the expand function, which you are implementing in the PlanGraph class
+            pg_next = self.next_level(self.graph[level - 1])  # create new PlanGraph object by expanding
             self.graph.append(pg_next)  # appending the new level to the plan graph
 
-            size_no_good = len(self.no_goods[level])  # remember size of nogood table
-
-        plan_solution = self.extract(self.graph, self.goal, level)
+        plan_solution = self.extract_goal(level)
         # try to extract a plan since all of the goal propositions are in current graph level, and are not mutex
 
         while plan_solution is None:  # while we didn't extract a plan successfully
+            if self.out_of_budget(check=True):
+                return None
+            if self.is_fixed(level):
+                # the graph has leveled off at self.fixed_level, and the extraction failed at a later level:
+                # if it found no new no-good at the level-off level, no later try will (Blum and Furst), we failed
+                size_no_good = self.no_goods.count(self.fixed_level)
+                if size_no_good == stable_size_no_good:
+                    return None
+                stable_size_no_good = size_no_good
+            self.lower_bound = level + 1
             level = level + 1
-            self.no_goods.append([])
-            pg_next = PlanGraphLevel()  # create next level of the graph by expanding
-            pg_next.expand(self.graph[level - 1])  # create next level of the graph by expanding
+            self.no_goods.add_level()
+            pg_next = self.next_level(self.graph[level - 1])  # create next level of the graph by expanding
             self.graph.append(pg_next)
-            plan_solution = self.extract(self.graph, self.goal, level)  # try to extract a plan again
-            if plan_solution is None and self.is_fixed(level):  # if failed and reached fixed point
-                if len(self.no_goods[level - 1]) == len(self.no_goods[level]):
-                    # if size of nogood didn't change, means there's nothing more to do. We failed.
-                    return None
-                size_no_good = len(self.no_goods[level])  # we didn't fail yet! update size of no good
+            plan_solution = self.extract_goal(level)  # try to extract a plan again
+        return plan_solution
+
+    def next_level(self, previous_level):
+        """
+        Returns the level that follows previous_level (the last level of the graph), according to self.expansion,
+        and records it in self.instrumentation if any.
+        Once the graph has leveled off (see is_fixed) the level is not expanded, it is the level-off level itself
+        """
+        if self.fixed_level is not None:
+            if self.instrumentation is not None:
+                self.instrumentation.record_level(self.graph[self.fixed_level], dict(), 0.0, virtual=True)
+            return self.graph[self.fixed_level]
+        if self.instrumentation is None:
+            return self.expand_level(previous_level, None)
+        phase_times = dict()
+        start = time.perf_counter()
+        pg_next = self.expand_level(previous_level, phase_times)
+        elapsed = time.perf_counter() - start
+        if not phase_times:
+            phase_times['expand'] = elapsed
+        self.instrumentation.record_level(pg_next, phase_times, elapsed)
+        return pg_next
+
+    def expand_level(self, previous_level, phase_times):
+        if self.expansion == 'leveled':
+            return self.leveled_graph.expand()
+        if self.expansion == 'numpy':
+            return previous_level.expand()
+        pg_next = PlanGraphLevel(self.context)
+        if self.expansion == 'incremental':
+            pg_next.expand_incremental(previous_level, phase_times)
+        else:
+            pg_next.expand(previous_level, phase_times)
+        return pg_next
+
+    def extract_goal(self, level):
+        """
+        Tries to extract a plan for the goal from the graph up to level.
+        Each try has its own node budget when the extraction is 'bounded'
+        """
+        self.extraction_stats['attempts'] += 1
+        self.attempt_nodes = 0
+        hits, misses, no_goods = self.no_goods.hits, self.no_goods.misses, self.no_goods.total()
+        start = time.perf_counter()
+        plan_solution = self.extract(self.graph, self.goal, level)
+        if self.instrumentation is not None:
+            self.instrumentation.record_extraction(level, self.attempt_nodes, self.no_goods.hits - hits,
+                                                   self.no_goods.misses - misses,
+                                                   self.no_goods.total() - no_goods, time.perf_counter() - start)
+        if self.budget_exhausted():
+            self.extraction_stats['budget_exhausted'] += 1
         return plan_solution
 
+    def budget_exhausted(self):
+        """
+        Returns true if the 'bounded' extraction has used its node budget,
+        from then on the search returns the first plan it finds
+        """
+        return self.extraction == 'bounded' and self.attempt_nodes > self.node_budget
+
+    def out_of_budget(self, check=False):
+        """
+        Returns true if the Budget of the search has run out, check also reads the clock and the memory
+        """
+        if self.budget is None:
+            return False
+        if check:
+            return not self.budget.check()
+        return self.budget.exhausted is not None
+
     def extract(self, graph, sub_goals, level):
         """
         The backsearch part of graphplan that tries
@@ -101,16 +269,20 @@ class GraphPlan(object):
 
         if level == 0:
             return []
-        if sub_goals in self.no_goods[level]:
+        if self.no_goods.is_no_good(level, sub_goals):  # a subset of sub_goals is known to fail at this level
             return None
         plan_solution = self.gp_search(graph, sub_goals, [], level)
         if plan_solution is not None:
-            # print("WAA:", [action.name for action in plan_solution])
             return plan_solution
-        self.no_goods[level].append([sub_goals])
+        if not self.out_of_budget():  # a search stopped by the budget proves nothing
+            self.no_goods.add(level, sub_goals)
         return None
 
     def gp_search(self, graph, sub_goals, _plan, level):
+        if self.budget is not None and not self.budget.charge():
+            return None  # out of budget, unwind the search keeping the plans already found
+        self.extraction_stats['nodes'] += 1
+        self.attempt_nodes += 1
         if len(sub_goals) == 0:
             new_goals = []
             for action in _plan:
@@ -124,28 +296,23 @@ class GraphPlan(object):
                 return new_plan + _plan
 
         prop = sub_goals[0]
-        providers = []
-        for action1 in [act for act in graph[level].get_action_layer().get_actions() if prop in act.get_add()]:
-            no_mutex = True
-            for action2 in _plan:
-                if Pair(action1, action2) not in self.independent_actions:
-                    no_mutex = False
-                    break
-            if no_mutex:
-                providers.append(action1)
+        action_layer = graph[level].get_action_layer()
+        # the producers of prop in the layer (noOps first) that are not mutex with an action already in the plan
+        providers = [action for action in action_layer.get_producers(prop)
+                     if self.no_mutex_action_in_plan(_plan, action, action_layer)]
 
         plans = []
         for action in providers:
-            new_sub_goals = [g for g in sub_goals if g not in action.get_add()]
+            new_sub_goals = [g for g in sub_goals if g not in action.add_set]
             plan_clone = list(_plan)
             plan_clone.append(action)
             new_plan = self.gp_search(graph, new_sub_goals, plan_clone, level)
             if new_plan is not None:
                 plans.append(new_plan)
+                if self.extraction == 'first' or self.budget_exhausted() or self.out_of_budget():
+                    break
         if len(plans) > 0:
-            plans_size = list(map(lambda p: len(p), plans))
-            import numpy as np
-            return plans[np.argmin(plans_size)]
+            return min(plans, key=len)
         return None
 
     def goal_state_not_in_prop_layer(self, propositions):
@@ -171,46 +338,53 @@ class GraphPlan(object):
     def is_fixed(self, level):
         """
         Checks if we have reached a fixed point, i.e. each level we'll expand would be the same,
-        thus no point in continuing
+        thus no point in continuing.
+        The graph has leveled off when level has the same propositions, actions and mutexes as the level before it,
+        since the next level only depends on the propositions and the mutexes of the last one.
+        The level before is then kept in self.fixed_level, and the later levels refer to it (see next_level)
         """
         if level == 0:
             return False
+        if self.fixed_level is not None:
+            return level > self.fixed_level
+        if not same_level(self.graph[level], self.graph[level - 1]):
+            return False
+        self.fixed_level = level - 1
+        return True
 
-        if len(self.graph[level].get_proposition_layer().get_propositions()) == \
-                len(self.graph[level - 1].get_proposition_layer().get_propositions()) and \
-                len(self.graph[level].get_proposition_layer().get_mutex_props()) == \
-                len(self.graph[level - 1].get_proposition_layer().get_mutex_props()):
-            return True
-        return False
-
-    def create_noops(self):
+    def create_noops(self, parser):
         """
-        Creates the noOps that are used to propagate propositions from one layer to the next
+        Creates the noOps that are used to propagate propositions from one layer to the next,
+        with ids from the registry of the actions of parser
         """
         for prop in self.propositions:
-            name = prop.name
-            precon = []
-            add = []
-            precon.append(prop)
-            add.append(prop)
-            delete = []
-            act = Action(name, precon, add, delete, True)
+            act = parser.create_noop(prop)
             self.actions.append(act)
             prop.add_producer(act)
 
     def independent(self):
         """
-        Creates a set of independent actions
+        Creates the set of independent actions, stored as interference bitsets (see IndependentActions)
         """
-        for i in range(len(self.actions)):
-            for j in range(i + 1, len(self.actions)):
-                act1 = self.actions[i]
-                act2 = self.actions[j]
-                if independent_pair(act1, act2):
-                    self.independent_actions.add(Pair(act1, act2))
+        self.independent_actions = IndependentActions(self.actions)
 
     def is_independent(self, a1, a2):
-        return Pair(a1, a2) in self.independent_actions
+        return self.independent_actions.is_independent(a1, a2)
+
+    def close(self):
+        """
+        Closes the CompiledDomain the domain was loaded from, if any,
+        after which the graph can not be expanded (its independent actions are read from it)
+        """
+        if self.compiled_domain is not None:
+            self.compiled_domain.close()
+            self.compiled_domain = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     @staticmethod
     def no_mutex_action_in_plan(plan_, act, action_layer):
@@ -219,11 +393,35 @@ class GraphPlan(object):
         returns true if there are no mutex actions in the plan
         """
         for plan_act in plan_:
-            if action_layer.is_mutex(Pair(plan_act, act)):
+            if action_layer.are_mutex(plan_act, act):
                 return False
         return True
 
 
+def same_level(level1, level2):
+    """
+    Returns true if the two levels of a graph have the same propositions, actions, and mutex pairs of both
+    """
+    props1, props2 = level1.get_proposition_layer(), level2.get_proposition_layer()
+    actions1, actions2 = level1.get_action_layer(), level2.get_action_layer()
+    if len(props1.get_propositions()) != len(props2.get_propositions()) or \
+            len(actions1.get_actions()) != len(actions2.get_actions()) or \
+            len(props1.get_mutex_props()) != len(props2.get_mutex_props()) or \
+            len(actions1.get_mutex_actions()) != len(actions2.get_mutex_actions()):
+        return False
+    return {prop.id for prop in props1.get_propositions()} == {prop.id for prop in props2.get_propositions()} and \
+        {action.id for action in actions1.get_actions()} == {action.id for action in actions2.get_actions()} and \
+        mutex_ids(props1.get_mutex_props()) == mutex_ids(props2.get_mutex_props()) and \
+        mutex_ids(actions1.get_mutex_actions()) == mutex_ids(actions2.get_mutex_actions())
+
+
+def mutex_ids(mutexes):
+    """
+    Returns the set of the (lower id, higher id) pairs of a mutex set
+    """
+    return {(a.id, b.id) if a.id < b.id else (b.id, a.id) for a, b in mutexes.pairs()}
+
+
 def independent_pair(a1: Action, a2: Action) -> bool:
     """
     Returns true if the actions neither have inconsistent effects
@@ -236,31 +434,55 @@ def independent_pair(a1: Action, a2: Action) -> bool:
     a1.is_pos_effect(p) returns true is p is in a1.get_add()
     a1.is_neg_effect(p) returns true is p is in a1.get_delete()
     """
-    cond1 = set(a1.get_pre()).intersection(set(a2.get_delete()))
-    cond2 = set(a2.get_pre()).intersection(set(a1.get_delete()))
-    cond3 = set(a1.get_add()).intersection(set(a2.get_delete()))
-    cond4 = set(a2.get_add()).intersection(set(a1.get_delete()))
+    cond1 = a1.pre_set & a2.delete_set
+    cond2 = a2.pre_set & a1.delete_set
+    cond3 = a1.add_set & a2.delete_set
+    cond4 = a2.add_set & a1.delete_set
     return not any([cond1, cond2, cond3, cond4])
 
 
 if __name__ == '__main__':
-    import sys
-    import time
-
-    if len(sys.argv) != 1 and len(sys.argv) != 3:
-        print("Usage: graph_plan.py domain_name problem_name")
-        exit()
-    domain = 'dwrDomain.txt'
-    problem = 'dwrProblem.txt'
-    if len(sys.argv) == 3:
-        domain = str(sys.argv[1])
-        problem = str(sys.argv[2])
-
-    gp = GraphPlan(domain, problem)
-    start = time.time()
-    plan = gp.graph_plan()
-    elapsed = time.time() - start
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Solves a planning problem with graphplan")
+    parser.add_argument('domain', nargs='?', default='dwrDomain.txt', help="domain file (default: %(default)s)")
+    parser.add_argument('problem', nargs='?', default='dwrProblem.txt', help="problem file (default: %(default)s)")
+    parser.add_argument('--expansion', choices=GraphPlan.expansions, default='full',
+                        help="how to expand the levels of the graph (default: %(default)s)")
+    parser.add_argument('--extraction', choices=GraphPlan.extractions, default='exhaustive',
+                        help="how to extract a plan from the graph (default: %(default)s)")
+    parser.add_argument('--node-budget', type=int, default=100000,
+                        help="search nodes of each try of the bounded extraction (default: %(default)s)")
+    parser.add_argument('--domain-cache', nargs='?', const='', metavar='DIR',
+                        help="load the compiled domain from the cache in DIR (default: ~/.cache/graphplan), "
+                             "compiling it first if needed")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="write the phase times, layer sizes and extraction counters of each level to a JSON file")
+    parser.add_argument('--profile', metavar='FILE', help="run graphplan under cProfile and write its profile to FILE")
+    add_budget_arguments(parser)
+    args = parser.parse_args()
+
+    cache = DomainCache(args.domain_cache or None) if args.domain_cache is not None else None
+    instrumentation = Instrumentation() if args.metrics else None
+    budget = budget_from_args(args)
+    with GraphPlan(args.domain, args.problem, expansion=args.expansion, extraction=args.extraction,
+                   node_budget=args.node_budget, domain_cache=cache, instrumentation=instrumentation) as gp:
+        start = time.time()
+        plan = profile_call(args.profile, gp.graph_plan, budget) if args.profile else gp.graph_plan(budget)
+        elapsed = time.time() - start
+    if instrumentation is not None:
+        instrumentation.write_json(args.metrics, elapsed=elapsed, parse_time=gp.parse_time,
+                                   extraction=gp.extraction_stats, no_good_hits=gp.no_goods.hits,
+                                   no_good_misses=gp.no_goods.misses)
     if plan is not None:
         print("Plan found with %d actions in %.2f seconds" % (len([act for act in plan if not act.is_noop()]), elapsed))
     else:
         print("Could not find a plan in %.2f seconds" % elapsed)
+    if budget is not None and budget.exhausted is not None:
+        print("Ran out of %s budget after %d search nodes, a plan has at least %d levels" %
+              (budget.exhausted, budget.nodes, gp.lower_bound))
+    print("%s in %.3f seconds" % ("Loaded the domain and parsed the problem" if cache is not None
+                                  else "Parsed the domain and problem", gp.parse_time))
+    print("Extraction (%s): %d search nodes in %d tries, %d tries ran out of node budget" %
+          (gp.extraction, gp.extraction_stats['nodes'], gp.extraction_stats['attempts'],
+           gp.extraction_stats['budget_exhausted']))
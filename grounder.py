@@ -0,0 +1,182 @@
+from collections import defaultdict
+
+
+def parse_atom(text):
+    """
+    Returns (predicate, arguments) of an atom written as PRED(arg1-arg2-...), or PRED for an atom without arguments
+    """
+    if not text.endswith(')') or '(' not in text:
+        return text, ()
+    predicate, arguments = text[:-1].split('(', 1)
+    return predicate, tuple(arguments.split('-')) if arguments else ()
+
+
+def format_atom(predicate, arguments):
+    if not arguments:
+        return predicate
+    return '%s(%s)' % (predicate, '-'.join(arguments))
+
+
+def is_variable(argument):
+    return argument.startswith('?')
+
+
+class Schema(object):
+    """
+    A lifted operator: an action with typed parameters, written in the domain file as
+    "Schema: Name(?x-?y) ?x:type1 ?y:type2 ?x!=?y" followed by its pre, add and delete lines,
+    where the atoms may use the parameters as arguments (see parse_atom).
+    ?x!=?y requires the two parameters to be bound to different objects
+    """
+
+    def __init__(self, header, pre, add, delete):
+        """
+        Constructor
+        header are the words of the Schema line after "Schema:", pre, add and delete are lists of atoms (strings)
+        """
+        self.name = parse_atom(header[0])
+        self.parameters = []  # the parameter names, in the order of their declaration
+        self.types = dict()  # parameter: type
+        self.distinct = []  # pairs of parameters that must be bound to different objects
+        for word in header[1:]:
+            if '!=' in word:
+                self.distinct.append(tuple(word.split('!=', 1)))
+            else:
+                parameter, type_name = word.split(':', 1)
+                self.parameters.append(parameter)
+                self.types[parameter] = type_name
+        self.pre = [parse_atom(atom) for atom in pre]
+        self.add = [parse_atom(atom) for atom in add]
+        self.delete = [parse_atom(atom) for atom in delete]
+        for predicate, arguments in self.pre + self.add + self.delete + [self.name]:
+            for argument in arguments:
+                if is_variable(argument) and argument not in self.types:
+                    raise ValueError("%s uses the undeclared parameter %s" % (header[0], argument))
+
+    def instantiate(self, binding):
+        """
+        Returns (name, pre, add, delete) of the action of the binding (parameter: object), atoms as strings
+        """
+        def ground(atoms):
+            return [format_atom(predicate, tuple(binding.get(argument, argument) for argument in arguments))
+                    for predicate, arguments in atoms]
+        predicate, arguments = self.name
+        name = format_atom(predicate, tuple(binding[argument] for argument in arguments))
+        return name, ground(self.pre), ground(self.add), ground(self.delete)
+
+
+class Grounder(object):
+    """
+    Instantiates the schemas of a domain into the actions that are reachable from an initial state,
+    in the style of the translator of Fast Downward: it explores the delete relaxation of the problem,
+    and an action is grounded when all its preconditions are reached.
+    Facts are processed one at a time from a queue: when a fact is processed, each precondition
+    of a schema with its predicate is bound to it, and the other preconditions are joined with the facts
+    already processed. Every binding is found when the last of its preconditions is processed,
+    so an action is never grounded unless it can become applicable in the relaxed problem.
+    Parameters that appear in no precondition range over the objects of their type
+    """
+
+    def __init__(self, schemas, types):
+        """
+        Constructor
+        types is a dict from a type name to the list of its objects
+        """
+        self.schemas = schemas
+        self.objects = {type_name: set(objects) for type_name, objects in types.items()}
+        self.triggers = defaultdict(list)  # predicate: (schema, index of a precondition with it)
+        for schema in schemas:
+            for i, (predicate, _) in enumerate(schema.pre):
+                self.triggers[predicate].append((schema, i))
+
+    def ground(self, initial_facts):
+        """
+        Returns the list of the reachable actions, as (name, pre, add, delete) tuples with atoms as strings
+        """
+        reached = defaultdict(list)  # predicate: argument tuples of the processed facts
+        seen = set()
+        queue = []
+        actions = []
+        grounded = set()  # action names
+
+        def emit(schema, binding):
+            for full_binding in self.complete(schema, binding):
+                action = schema.instantiate(full_binding)
+                if action[0] in grounded:
+                    continue
+                grounded.add(action[0])
+                actions.append(action)
+                for atom in action[2]:
+                    if atom not in seen:
+                        seen.add(atom)
+                        queue.append(atom)
+
+        for atom in initial_facts:
+            if atom not in seen:
+                seen.add(atom)
+                queue.append(atom)
+        for schema in self.schemas:
+            if not schema.pre:
+                emit(schema, dict())
+        while queue:
+            predicate, arguments = parse_atom(queue.pop())
+            reached[predicate].append(arguments)
+            for schema, i in self.triggers.get(predicate, ()):
+                binding = self.unify(schema, schema.pre[i][1], arguments, dict())
+                if binding is None:
+                    continue
+                others = schema.pre[:i] + schema.pre[i + 1:]
+                for joined in self.join(schema, others, binding, reached):
+                    emit(schema, joined)
+        return actions
+
+    def unify(self, schema, pattern, arguments, binding):
+        """
+        Returns binding extended so that pattern matches arguments, or None if it can not be
+        """
+        if len(pattern) != len(arguments):
+            return None
+        extended = None
+        for variable, value in zip(pattern, arguments):
+            if not is_variable(variable):
+                if variable != value:
+                    return None
+                continue
+            bound = (extended or binding).get(variable)
+            if bound is None:
+                if value not in self.objects.get(schema.types[variable], ()):
+                    return None
+                if extended is None:
+                    extended = dict(binding)
+                extended[variable] = value
+            elif bound != value:
+                return None
+        return extended if extended is not None else binding
+
+    def join(self, schema, atoms, binding, reached):
+        """
+        Yields the extensions of binding that match every atom of atoms with a processed fact
+        """
+        if not atoms:
+            yield binding
+            return
+        predicate, pattern = atoms[0]
+        for arguments in reached.get(predicate, ()):
+            extended = self.unify(schema, pattern, arguments, binding)
+            if extended is not None:
+                yield from self.join(schema, atoms[1:], extended, reached)
+
+    def complete(self, schema, binding):
+        """
+        Yields the bindings of all the parameters that extend binding and satisfy the distinct constraints
+        """
+        free = [parameter for parameter in schema.parameters if parameter not in binding]
+        if free:
+            parameter = free[0]
+            for value in sorted(self.objects.get(schema.types[parameter], ())):
+                extended = dict(binding)
+                extended[parameter] = value
+                yield from self.complete(schema, extended)
+            return
+        if all(binding[a] != binding[b] for a, b in schema.distinct):
+            yield binding
@@ -35,6 +35,26 @@ def create_domain_file(domain_file_name, n_, m_):
     domain_file.close()
 
 
+def create_lifted_domain_file(domain_file_name, n_, m_):
+    """
+    Writes the domain with a single Move schema instead of all its grounded actions,
+    the actions are grounded when the domain is parsed with a problem (see pgparser.py)
+    """
+    disks = ['d_%s' % i for i in list(range(n_))]  # [d_0,..., d_(n_ - 1)]
+    pegs = ['p_%s' % i for i in list(range(m_))]  # [p_0,..., p_(m_ - 1)]
+    domain_file = open(domain_file_name, 'w')
+    domain_file.write("Propositions:\n\n")  # the propositions are the ones reached by the grounding
+    domain_file.write("Types:\n")
+    domain_file.write("disk: %s\n" % " ".join(disks))
+    domain_file.write("place: %s\n" % " ".join(disks + pegs))  # where a disk can be moved from or to
+    domain_file.write("Actions:\n")
+    domain_file.write("Schema: Move(?d-?a-?b) ?d:disk ?a:place ?b:place ?a!=?b\n")
+    domain_file.write("Pre: CLEAR(?d) ON(?d-?a) CLEAR(?b) SMALLER(?d-?b)\n")
+    domain_file.write("Add: CLEAR(?a) ON(?d-?b)\n")
+    domain_file.write("Del: ON(?d-?a) CLEAR(?b)\n")
+    domain_file.close()
+
+
 def create_problem_file(problem_file_name_, n_, m_):
     disks = ['d_%s' % i for i in list(range(n_))]  # [d_0,..., d_(n_ - 1)]
     pegs = ['p_%s' % i for i in list(range(m_))]  # [p_0,..., p_(m_ - 1)]
@@ -76,8 +96,8 @@ def create_problem_file(problem_file_name_, n_, m_):
 
 
 if __name__ == '__main__':
-    if len(sys.argv) != 3:
-        print('Usage: hanoi.py n m')
+    if len(sys.argv) not in (3, 4) or (len(sys.argv) == 4 and sys.argv[3] != '--grounded'):
+        print('Usage: hanoi.py n m [--grounded]')
         sys.exit(2)
 
     n = int(float(sys.argv[1]))  # number of disks
@@ -86,5 +106,8 @@ if __name__ == '__main__':
     domain_file_name = 'hanoi_%s_%s_domain.txt' % (n, m)
     problem_file_name = 'hanoi_%s_%s_problem.txt' % (n, m)
 
-    create_domain_file(domain_file_name, n, m)
+    if len(sys.argv) == 4:
+        create_domain_file(domain_file_name, n, m)  # every Move action written out
+    else:
+        create_lifted_domain_file(domain_file_name, n, m)
     create_problem_file(problem_file_name, n, m)
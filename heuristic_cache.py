@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+from action import to_mask
+
+
+class HeuristicCache(object):
+    """
+    Memoizes a heuristic function of planning_problem.py (heuristic(state, planning_problem)).
+    A state is keyed by its bitmask over the proposition ids (see Proposition.id), which is also the state itself
+    in compiled mode, together with the bitmask of the goal, so that the cache can be shared between
+    consecutive solves of problems of the same domain (with different initial states or goals).
+    At most max_size values are kept, the least recently used one is evicted first.
+    """
+
+    def __init__(self, heuristic, max_size=100000):
+        """
+        Constructor
+        """
+        self.heuristic = heuristic
+        self.max_size = max_size
+        self.values = OrderedDict()  # (goal mask, state mask): heuristic value, least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__name__ = getattr(heuristic, '__name__', 'heuristic')
+
+    def __call__(self, state, planning_problem):
+        state_mask = state if isinstance(state, int) else to_mask(state)
+        key = (planning_problem.goal_mask, state_mask)
+        value = self.values.get(key)
+        if value is not None:
+            self.hits += 1
+            self.values.move_to_end(key)
+            return value
+        self.misses += 1
+        value = self.heuristic(state, planning_problem)
+        self.values[key] = value
+        if len(self.values) > self.max_size:
+            self.values.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def clear(self):
+        self.values.clear()
+
+    def __len__(self):
+        return len(self.values)
+
+    def get_stats(self):
+        """
+        Returns a line with the hit and miss counters, for printing next to the number of expanded nodes
+        """
+        lookups = self.hits + self.misses
+        rate = 100.0 * self.hits / lookups if lookups else 0.0
+        return "Heuristic cache: %d hits, %d misses (%.1f%% hit rate), %d evictions" % (
+            self.hits, self.misses, rate, self.evictions)
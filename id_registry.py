@@ -0,0 +1,36 @@
+import threading
+
+
+class IdRegistry(object):
+    """
+    Interns names into dense integer ids (0, 1, 2, ...) in the order in which they are first seen.
+    An id is also the bit of its proposition or action in a bitmask (see action.to_mask), so every domain
+    has its own registries (see PgParser), and its masks are as wide as the domain has names,
+    whatever other domains the process has parsed before
+    """
+
+    def __init__(self, ids=None):
+        """
+        Constructor
+        ids is a dict name: id to start from, such as the ids of the propositions of a parsed domain
+        """
+        self.ids = dict(ids) if ids is not None else dict()  # name: id
+        self.next_id = max(self.ids.values()) + 1 if self.ids else 0
+        self.lock = threading.Lock()
+
+    def get(self, name):
+        """
+        Returns the id of name, interning it if it is new
+        """
+        name_id = self.ids.get(name)
+        if name_id is None:
+            with self.lock:
+                name_id = self.ids.get(name)
+                if name_id is None:
+                    name_id = self.next_id
+                    self.ids[name] = name_id
+                    self.next_id += 1
+        return name_id
+
+    def __len__(self):
+        return len(self.ids)
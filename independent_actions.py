@@ -0,0 +1,67 @@
+from collections import defaultdict
+
+
+class IndependentActions(object):
+    """
+    The independent pairs of actions of a domain (see graph_plan.independent_pair),
+    stored by their complement: for each action id, a bitset of the ids of the actions it interferes with.
+    Two actions interfere if one deletes a precondition or a positive effect of the other.
+    The bitsets are computed as the boolean matrix products Pre * Del^T | Del * Pre^T | Add * Del^T | Del * Add^T,
+    where each row of the result is the union of the columns (bitsets of actions) of the propositions of one action,
+    so the cost depends on the size of the pre, add and delete lists instead of on the number of pairs.
+    It can be used where the set of independent pairs was used: "Pair(a1, a2) in independent_actions" works.
+    """
+
+    def __init__(self, actions=()):
+        """
+        Constructor
+        """
+        self.actions = dict()  # id: action
+        self.rows = dict()  # id: bitset of the ids of the actions that interfere with the action
+        deleters = defaultdict(int)  # prop id: bitset of the actions that delete it
+        users = defaultdict(int)  # prop id: bitset of the actions that have it as a precondition or positive effect
+        for action in actions:
+            self.actions[action.id] = action
+            bit = 1 << action.id
+            for prop in action.get_delete():
+                deleters[prop.id] |= bit
+            for prop in action.get_pre():
+                users[prop.id] |= bit
+            for prop in action.get_add():
+                users[prop.id] |= bit
+        for action in self.actions.values():
+            row = 0
+            for prop in action.get_pre():  # a deletes a precondition of b, or b deletes a precondition of a
+                row |= deleters.get(prop.id, 0)
+            for prop in action.get_add():
+                row |= deleters.get(prop.id, 0)
+            for prop in action.get_delete():
+                row |= users.get(prop.id, 0)
+            self.rows[action.id] = row
+
+    def get_mask(self, action):
+        """
+        Returns the bitset of the ids of the actions that interfere with action
+        """
+        return self.rows.get(action.id, 0)
+
+    def interfere(self, a1, a2):
+        return self.rows.get(a1.id, 0) >> a2.id & 1 == 1
+
+    def is_independent(self, a1, a2):
+        """
+        Returns true if a1 and a2 are two different actions that do not interfere
+        """
+        return a1.id != a2.id and not self.interfere(a1, a2)
+
+    def __contains__(self, pair):
+        return self.is_independent(pair.a, pair.b)
+
+    def __len__(self):
+        """
+        Returns the number of independent pairs
+        """
+        n = len(self.actions)
+        interfering = sum(bin(row).count('1') for row in self.rows.values())
+        self_interfering = sum(row >> action_id & 1 for action_id, row in self.rows.items())
+        return (n * (n - 1) - (interfering - self_interfering)) // 2
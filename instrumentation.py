@@ -0,0 +1,103 @@
+import cProfile
+import json
+import time
+
+PHASES = ('update_action_layer', 'update_mutex_actions', 'update_proposition_layer', 'update_mutex_proposition')
+
+
+class Instrumentation(object):
+    """
+    Opt-in measurements of a solve, filled by GraphPlan (given one as its instrumentation) and by
+    record_search for the A* engine, and read as a dict (to_dict) or written as JSON (write_json).
+    For each level of the planning graph: the seconds spent in each phase of its expansion (see PHASES,
+    'expand' for the leveled and numpy expansions, which do not run the phases one by one),
+    the number of actions, propositions and mutex pairs of its layers.
+    For each try to extract a plan: the level, the gp_search nodes, the no-good hits and misses
+    (see NoGoodStore) and the no-goods it added.
+    For a search: the counters of its SearchStatistics, with the heuristic and successor times
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.levels = []  # a dict per level of the graph, in order
+        self.extractions = []  # a dict per try to extract a plan, in order
+        self.search = None  # the dict of the SearchStatistics of the search, see record_search
+
+    def record_level(self, graph_level, phase_times, elapsed, virtual=False):
+        """
+        Records a level of the graph, which took elapsed seconds to expand, phase_times is a dict phase: seconds.
+        A virtual level is one after the graph has leveled off, which refers to the level-off level
+        """
+        action_layer = graph_level.get_action_layer()
+        proposition_layer = graph_level.get_proposition_layer()
+        self.levels.append({'level': len(self.levels),
+                            'virtual': virtual,
+                            'time': elapsed,
+                            'phases': dict(phase_times),
+                            'actions': len(action_layer.get_actions()),
+                            'propositions': len(proposition_layer.get_propositions()),
+                            'action_mutexes': len(action_layer.get_mutex_actions()),
+                            'proposition_mutexes': len(proposition_layer.get_mutex_props())})
+
+    def record_extraction(self, level, nodes, hits, misses, no_goods, elapsed):
+        self.extractions.append({'level': level, 'time': elapsed, 'nodes': nodes, 'no_good_hits': hits,
+                                 'no_good_misses': misses, 'no_goods_added': no_goods})
+
+    def record_search(self, statistics):
+        """
+        Records the SearchStatistics of a finished search
+        """
+        self.search = statistics.to_dict()
+
+    def phase_totals(self):
+        """
+        Returns a dict phase: seconds spent in it over all the levels
+        """
+        totals = dict()
+        for level in self.levels:
+            for phase, seconds in level['phases'].items():
+                totals[phase] = totals.get(phase, 0.0) + seconds
+        return totals
+
+    def to_dict(self):
+        return {'levels': self.levels,
+                'phase_totals': self.phase_totals(),
+                'extractions': self.extractions,
+                'search': self.search}
+
+    def write_json(self, path, **extra):
+        """
+        Writes to_dict, with the extra keys, to the JSON file path
+        """
+        data = self.to_dict()
+        data.update(extra)
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def run_phases(phases, phase_times=None):
+    """
+    Runs the (name, function, arguments) phases in order,
+    and adds the seconds each one takes to phase_times (a dict name: seconds) if given
+    """
+    for name, function, arguments in phases:
+        if phase_times is None:
+            function(*arguments)
+        else:
+            start = time.perf_counter()
+            function(*arguments)
+            phase_times[name] = phase_times.get(name, 0.0) + time.perf_counter() - start
+
+
+def profile_call(path, function, *args, **kwargs):
+    """
+    Returns function(*args, **kwargs), run under cProfile, and writes its profile to path
+    (a pstats file, read with "python -m pstats path" or any viewer of cProfile output)
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args, **kwargs)
+    finally:
+        profiler.dump_stats(path)
@@ -0,0 +1,296 @@
+from collections.abc import Set
+from itertools import chain
+
+from action import to_mask
+from mutex_set import MutexSet
+from plan_graph_level import mutex_actions
+from util import Pair
+
+
+class LeveledGraph(object):
+    """
+    A planning graph in which every proposition and every action is stored once,
+    together with the first level in which it appears, and every mutex is stored once,
+    together with the last level in which it holds (as in the STAN and IPP planners).
+    This is possible since the planning graph is monotone: propositions and actions are only added
+    from one level to the next, and mutexes only disappear.
+    get_level(i) returns a view of level i with the PlanGraphLevel API (see LeveledGraphLevel).
+    Level 0 only has the propositions of the initial state, the action layer of level i >= 1
+    consists of the actions whose preconditions hold (and are not mutex) in the proposition layer of level i - 1.
+    """
+
+    def __init__(self, context, initial_state):
+        """
+        Constructor
+        context is the DomainContext of the domain, its actions include the noOps
+        """
+        self.actions = context.actions
+        self.independent_actions = context.independent_actions
+        self.depth = 0  # the last level of the graph
+        self.prop_level = dict()  # Prop: the first level in which the proposition appears
+        self.action_level = dict()  # Action: the first level in which the action appears
+        self.props_by_level = [list()]  # the propositions that first appear in each level
+        self.actions_by_level = [list()]  # the actions that first appear in each level
+        self.prop_counts = [0]  # the number of propositions in each level
+        self.action_counts = [0]  # the number of actions in each level
+        self.producers = dict()  # Prop: the actions that add it, the noOp first and then in order of appearance
+        self.producer_masks = dict()  # Prop: bitset of the ids of the actions in producers
+        self.props_mask = 0  # bitset of the ids of the propositions in the last level
+        self.prop_mutex = MutexSet()  # the proposition mutexes of the last level
+        self.action_mutex = MutexSet()  # the action mutexes of the last level
+        self.prop_mutex_ended = dict()  # (id, id): the last level of a proposition mutex that no longer holds
+        self.action_mutex_ended = dict()  # (id, id): the last level of an action mutex that no longer holds
+        self.prop_mutex_counts = [0]  # the number of proposition mutexes in each level
+        self.action_mutex_counts = [0]  # the number of action mutexes in each level
+        for prop in initial_state:
+            if prop not in self.prop_level:
+                self.add_proposition(prop, 0)
+        self.prop_counts[0] = len(self.props_by_level[0])
+
+    def add_proposition(self, prop, level):
+        self.prop_level[prop] = level
+        self.props_by_level[level].append(prop)
+        self.producers[prop] = []
+        self.producer_masks[prop] = 0
+        self.props_mask |= 1 << prop.id
+
+    def get_level(self, level):
+        """
+        Returns a view of the given level of the graph
+        """
+        return LeveledGraphLevel(self, level)
+
+    def expand(self):
+        """
+        Adds the next level to the graph and returns a view of it.
+        Like PlanGraphLevel.expand_incremental, only the actions that are not in the graph yet are tested,
+        and only the pairs that were mutex in the last level (or that involve a new element) are checked
+        """
+        level = self.depth + 1
+        self.props_by_level.append(list())
+        self.actions_by_level.append(list())
+
+        previous_prop_mutex = self.prop_mutex
+        new_actions = [action for action in self.actions
+                       if action not in self.action_level and self.is_applicable(action, previous_prop_mutex)]
+
+        action_mutex = MutexSet()
+        for a1, a2 in self.action_mutex.pairs():
+            if mutex_actions(a1, a2, previous_prop_mutex, self.independent_actions):
+                action_mutex.add_mutex(a1, a2)
+            else:
+                self.action_mutex_ended[mutex_key(a1, a2)] = level - 1
+        old_actions = list(self.action_level)
+        for i, a1 in enumerate(new_actions):
+            for a2 in chain(old_actions, new_actions[i + 1:]):
+                if mutex_actions(a1, a2, previous_prop_mutex, self.independent_actions):
+                    action_mutex.add_mutex(a1, a2)
+
+        old_props = list(self.prop_level)
+        for action in new_actions:
+            self.action_level[action] = level
+            self.actions_by_level[level].append(action)
+            for prop in action.get_add():
+                if prop not in self.prop_level:
+                    self.add_proposition(prop, level)
+                if action.is_noop():
+                    self.producers[prop].insert(0, action)
+                else:
+                    self.producers[prop].append(action)
+                self.producer_masks[prop] |= 1 << action.id
+        new_props = self.props_by_level[level]
+
+        prop_mutex = MutexSet()
+        for p1, p2 in previous_prop_mutex.pairs():
+            if self.producers_mutex(p1, p2, action_mutex):
+                prop_mutex.add_mutex(p1, p2)
+            else:
+                self.prop_mutex_ended[mutex_key(p1, p2)] = level - 1
+        for i, p1 in enumerate(new_props):
+            for p2 in chain(old_props, new_props[i + 1:]):
+                if self.producers_mutex(p1, p2, action_mutex):
+                    prop_mutex.add_mutex(p1, p2)
+
+        self.depth = level
+        self.action_mutex = action_mutex
+        self.prop_mutex = prop_mutex
+        self.action_counts.append(len(self.action_level))
+        self.prop_counts.append(len(self.prop_level))
+        self.action_mutex_counts.append(len(action_mutex))
+        self.prop_mutex_counts.append(len(prop_mutex))
+        return self.get_level(level)
+
+    def is_applicable(self, action, prop_mutex):
+        """
+        Returns true if the preconditions of action are in the last level and are not pairwise mutex
+        """
+        pre_mask = action.pre_mask
+        if pre_mask & ~self.props_mask:
+            return False
+        return not any(prop_mutex.get_mask(pre) & pre_mask for pre in action.get_pre())
+
+    def producers_mutex(self, p1, p2, action_mutex):
+        """
+        Returns true if every producer of p1 is mutex with every producer of p2 (see mutex_propositions)
+        """
+        producers_mask = self.producer_masks[p2]
+        return all(action_mutex.get_mask(a) & producers_mask == producers_mask for a in self.producers[p1])
+
+    def get_producers(self, prop, level):
+        """
+        Returns the actions of the given level that have prop in their add list, the noOp first
+        """
+        return [action for action in self.producers.get(prop, ()) if self.action_level[action] <= level]
+
+
+def mutex_key(a, b):
+    return (a.id, b.id) if a.id < b.id else (b.id, a.id)
+
+
+class LevelSet(Set):
+    """
+    A read only set of the elements (propositions or actions) of a single level of a LeveledGraph,
+    computed from the first level of each element instead of being stored
+    """
+
+    def __init__(self, first_level, by_level, counts, level):
+        self.first_level = first_level  # element: the first level in which it appears
+        self.by_level = by_level  # the elements that first appear in each level
+        self.counts = counts  # the number of elements in each level
+        self.level = level
+
+    def __contains__(self, element):
+        first_level = self.first_level.get(element)
+        return first_level is not None and first_level <= self.level
+
+    def __iter__(self):
+        return chain.from_iterable(self.by_level[:self.level + 1])
+
+    def __len__(self):
+        return self.counts[self.level]
+
+
+class LevelMutexes(object):
+    """
+    The mutex pairs of a single level of a LeveledGraph, with the read API of MutexSet
+    """
+
+    def __init__(self, graph, kind, members, level):
+        self.graph = graph
+        self.kind = kind  # 'prop' or 'action'
+        self.members = members  # the LevelSet of the elements of the level
+        self.level = level
+
+    def frontier(self):
+        return self.graph.prop_mutex if self.kind == 'prop' else self.graph.action_mutex
+
+    def ended(self):
+        return self.graph.prop_mutex_ended if self.kind == 'prop' else self.graph.action_mutex_ended
+
+    def is_mutex(self, a, b):
+        if a not in self.members or b not in self.members:
+            return False
+        # a mutex that still holds in the last level held in every level since both elements appeared
+        return self.frontier().is_mutex(a, b) or self.ended().get(mutex_key(a, b), -1) >= self.level
+
+    def get_mask(self, a):
+        return to_mask(b for b in self.members if self.is_mutex(a, b))
+
+    def pairs(self):
+        for a, b in self.frontier().pairs():
+            if a in self.members and b in self.members:
+                yield a, b
+        elements = {element.id: element for element in self.members}
+        for (a_id, b_id), last_level in self.ended().items():
+            if last_level >= self.level and a_id in elements and b_id in elements:
+                yield elements[a_id], elements[b_id]
+
+    def __contains__(self, pair):
+        return self.is_mutex(pair.a, pair.b)
+
+    def __len__(self):
+        counts = self.graph.prop_mutex_counts if self.kind == 'prop' else self.graph.action_mutex_counts
+        return counts[self.level]
+
+    def __iter__(self):
+        for a, b in self.pairs():
+            yield Pair(a, b)
+
+
+class LeveledActionLayer(object):
+    """
+    A view of the action layer of a single level of a LeveledGraph, with the read API of ActionLayer
+    """
+
+    def __init__(self, graph, level):
+        self.graph = graph
+        self.level = level
+        self.actions = LevelSet(graph.action_level, graph.actions_by_level, graph.action_counts, level)
+        self.mutexActions = LevelMutexes(graph, 'action', self.actions, level)
+
+    def get_actions(self):
+        return self.actions
+
+    def get_mutex_actions(self):
+        return self.mutexActions
+
+    def is_mutex(self, pair):
+        return pair in self.mutexActions
+
+    def are_mutex(self, a1, a2):
+        return self.mutexActions.is_mutex(a1, a2)
+
+    def get_producers(self, prop):
+        return self.graph.get_producers(prop, self.level)
+
+    def effect_exists(self, prop):
+        return len(self.graph.get_producers(prop, self.level)) > 0
+
+
+class LeveledPropositionLayer(object):
+    """
+    A view of the proposition layer of a single level of a LeveledGraph, with the read API of PropositionLayer
+    """
+
+    def __init__(self, graph, level):
+        self.graph = graph
+        self.level = level
+        self.propositions = LevelSet(graph.prop_level, graph.props_by_level, graph.prop_counts, level)
+        self.mutexPropositions = LevelMutexes(graph, 'prop', self.propositions, level)
+
+    def get_propositions(self):
+        return self.propositions
+
+    def is_mutex(self, p1, p2):
+        return self.mutexPropositions.is_mutex(p1, p2)
+
+    def get_mutex_props(self):
+        return self.mutexPropositions
+
+    def get_producers(self, prop):
+        return self.graph.get_producers(prop, self.level)
+
+    def all_preconds_in_layer(self, action):
+        for pre in action.get_pre():
+            if pre not in self.propositions:
+                return False
+        return not any(self.is_mutex(p1, p2) for p1 in action.get_pre() for p2 in action.get_pre())
+
+
+class LeveledGraphLevel(object):
+    """
+    A view of a single level of a LeveledGraph, with the read API of PlanGraphLevel
+    """
+
+    def __init__(self, graph, level):
+        """
+        Constructor
+        """
+        self.action_layer = LeveledActionLayer(graph, level)
+        self.proposition_layer = LeveledPropositionLayer(graph, level)
+
+    def get_proposition_layer(self):
+        return self.proposition_layer
+
+    def get_action_layer(self):
+        return self.action_layer
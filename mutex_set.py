@@ -0,0 +1,108 @@
+from util import Pair
+
+
+class MutexSet(object):
+    """
+    A set of mutex pairs (of actions or of propositions) stored as adjacency bitsets.
+    For each element id it keeps an int whose bit j is set iff the element is mutex with the element of id j,
+    so a membership test is a dict lookup and a shift, and the elements mutex with a given element
+    can be intersected with any other bitset (for example action.pre_mask) in one operation.
+    It can be used where a set of Pair objects is expected: "Pair(a, b) in mutex_set", len() and iteration work.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.masks = dict()  # id: bitset of the ids of the elements that are mutex with it, never 0
+        self.elements = dict()  # id: element, to turn bits back into objects
+        self.size = 0  # number of unordered mutex pairs
+
+    def add_mutex(self, a, b):
+        """
+        Adds the pair (a, b) to the set, the order of a and b does not matter
+        """
+        bit_b = 1 << b.id
+        mask_a = self.masks.get(a.id, 0)
+        if mask_a & bit_b:
+            return
+        self.masks[a.id] = mask_a | bit_b
+        self.masks[b.id] = self.masks.get(b.id, 0) | 1 << a.id
+        self.elements[a.id] = a
+        self.elements[b.id] = b
+        self.size += 1
+
+    def remove_mutex(self, a, b):
+        """
+        Removes the pair (a, b) from the set if it is there
+        """
+        mask_a = self.masks.get(a.id, 0)
+        if not mask_a >> b.id & 1:
+            return
+        self._clear_bit(a.id, b.id)
+        if a.id != b.id:
+            self._clear_bit(b.id, a.id)
+        self.size -= 1
+
+    def _clear_bit(self, element_id, bit):
+        mask = self.masks[element_id] & ~(1 << bit)
+        if mask:
+            self.masks[element_id] = mask
+        else:
+            del self.masks[element_id]
+
+    def is_mutex(self, a, b):
+        """
+        Returns true if a and b are mutex, without creating a Pair
+        """
+        return self.masks.get(a.id, 0) >> b.id & 1 == 1
+
+    def get_mask(self, a):
+        """
+        Returns the bitset of the ids of all the elements that are mutex with a
+        """
+        return self.masks.get(a.id, 0)
+
+    def add(self, pair):
+        self.add_mutex(pair.a, pair.b)
+
+    def discard(self, pair):
+        self.remove_mutex(pair.a, pair.b)
+
+    def copy(self):
+        other = MutexSet()
+        other.masks = dict(self.masks)
+        other.elements = dict(self.elements)
+        other.size = self.size
+        return other
+
+    def __contains__(self, pair):
+        return self.is_mutex(pair.a, pair.b)
+
+    def __len__(self):
+        return self.size
+
+    def pairs(self):
+        """
+        Yields every mutex pair once, as a tuple (a, b)
+        """
+        elements = self.elements
+        for a_id, mask in self.masks.items():
+            mask = mask >> a_id << a_id  # pairs (a, b) with b.id < a.id were yielded from b
+            while mask:
+                low_bit = mask & -mask
+                yield elements[a_id], elements[low_bit.bit_length() - 1]
+                mask ^= low_bit
+
+    def __iter__(self):
+        """
+        Yields every mutex pair once, as a Pair object
+        """
+        for a, b in self.pairs():
+            yield Pair(a, b)
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.masks == other.masks
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
@@ -0,0 +1,95 @@
+class NoGoodTrie(object):
+    """
+    The no-goods of a single level of the graph: sets of propositions that cannot be achieved together at that level.
+    A no-good is stored in canonical form, as the sorted ids of its propositions (see Proposition.id),
+    along a path of a trie of nested dicts, so that the order of the goals does not matter
+    and a lookup finds any stored no-good that is a subset of the given goals.
+    """
+    END = None  # key that marks the end of a stored no-good
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.root = dict()  # id: child node
+        self.size = 0  # number of stored no-goods
+
+    def add(self, goals):
+        """
+        Adds the set of propositions goals, returns false if it was already stored
+        """
+        node = self.root
+        for prop_id in sorted({prop.id for prop in goals}):
+            node = node.setdefault(prop_id, dict())
+        if NoGoodTrie.END in node:
+            return False
+        node[NoGoodTrie.END] = True
+        self.size += 1
+        return True
+
+    def contains_subset(self, goals):
+        """
+        Returns true if a stored no-good is a subset of goals (then goals cannot be achieved either)
+        """
+        return self._contains_subset(self.root, sorted({prop.id for prop in goals}), 0)
+
+    def _contains_subset(self, node, ids, start):
+        if NoGoodTrie.END in node:
+            return True
+        for i in range(start, len(ids)):
+            child = node.get(ids[i])
+            if child is not None and self._contains_subset(child, ids, i + 1):
+                return True
+        return False
+
+    def __len__(self):
+        return self.size
+
+
+class NoGoodStore(object):
+    """
+    The no-good memoization of the backward search of graphplan, one NoGoodTrie for each level of the graph.
+    Counts the lookups that pruned the search (hits) and the ones that did not (misses).
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.levels = []
+        self.hits = 0
+        self.misses = 0
+
+    def add_level(self):
+        self.levels.append(NoGoodTrie())
+
+    def add(self, level, goals):
+        """
+        Records that the set of propositions goals cannot be achieved at level
+        """
+        return self.levels[level].add(goals)
+
+    def is_no_good(self, level, goals):
+        """
+        Returns true if goals contains a set of propositions that is known to be unachievable at level
+        """
+        if self.levels[level].contains_subset(goals):
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def count(self, level):
+        """
+        Returns the number of no-goods stored for level
+        """
+        return len(self.levels[level])
+
+    def total(self):
+        """
+        Returns the number of no-goods stored for all the levels
+        """
+        return sum(len(trie) for trie in self.levels)
+
+    def __len__(self):
+        return len(self.levels)
@@ -0,0 +1,242 @@
+import numpy as np
+
+from util import Pair
+
+
+class DomainMatrices(object):
+    """
+    The incidence matrices of a domain, for expanding the planning graph with NumPy (see NumpyLevel).
+    Row i of pre, add and delete is the boolean vector, over the propositions of the domain,
+    of the preconditions, positive effects and negative effects of the action actions[i].
+    interference[i, j] is true if the actions actions[i] and actions[j] interfere, it does not depend on the level
+    so it is computed once for the domain, and each level reads the rows and columns of its actions.
+    """
+
+    def __init__(self, actions):
+        """
+        Constructor
+        actions are all the actions of the domain (including noOps)
+        """
+        self.actions = list(actions)
+        props = dict()  # id: Prop, every proposition that appears in an action
+        for action in self.actions:
+            for prop in action.get_pre() + action.get_add() + action.get_delete():
+                props.setdefault(prop.id, prop)
+        self.props = [props[prop_id] for prop_id in sorted(props)]
+        self.prop_index = {prop.id: j for j, prop in enumerate(self.props)}  # prop id: column
+        self.pre = self.incidence(lambda action: action.get_pre())
+        self.add = self.incidence(lambda action: action.get_add())
+        self.delete = self.incidence(lambda action: action.get_delete())
+        self.interference = boolean_product(self.pre, self.delete.T) | boolean_product(self.add, self.delete.T)
+        self.interference |= self.interference.T
+
+    def incidence(self, get_propositions):
+        """
+        Returns the boolean matrix whose row i is the vector of get_propositions(actions[i])
+        """
+        matrix = np.zeros((len(self.actions), len(self.props)), dtype=bool)
+        for i, action in enumerate(self.actions):
+            for prop in get_propositions(action):
+                matrix[i, self.prop_index[prop.id]] = True
+        return matrix
+
+    def columns(self, propositions):
+        """
+        Returns the columns of the given propositions, the ones that no action uses are skipped
+        """
+        return np.array(sorted(self.prop_index[prop.id] for prop in propositions if prop.id in self.prop_index),
+                        dtype=np.intp)
+
+
+def boolean_product(a, b):
+    """
+    Returns the boolean matrix product of a and b, computed by BLAS on float32 matrices
+    (the entries are sums of products of 0/1 values, so "> 0" is exact)
+    """
+    return (a.astype(np.float32) @ b.astype(np.float32)) > 0
+
+
+class NumpyLevel(object):
+    """
+    A level of the planning graph held as NumPy arrays, with the read API of PlanGraphLevel.
+    The level has the indices (rows of DomainMatrices) of the actions of its action layer and their mutex matrix,
+    and the indices (columns of DomainMatrices) of the propositions of its proposition layer and their mutex matrix.
+    expand() computes the next level with matrix operations instead of loops over pairs:
+    an action is applicable if its preconditions are in the layer and Pre * M_prop * Pre^T is false for it,
+    two actions are mutex if they interfere (Pre * Del^T | Del * Pre^T | Add * Del^T | Del * Add^T)
+    or have competing needs (Pre * M_prop * Pre^T), and two propositions are mutex if no pair of their producers
+    is non mutex (Prod^T * not(M_action) * Prod is false).
+    """
+
+    def __init__(self, matrices, action_indices, action_mutex, prop_indices, prop_mutex):
+        """
+        Constructor
+        """
+        self.matrices = matrices
+        self.action_indices = action_indices  # rows of the actions of the level, sorted
+        self.action_mutex = action_mutex  # boolean matrix over action_indices
+        self.prop_indices = prop_indices  # columns of the propositions of the level, sorted
+        self.prop_mutex = prop_mutex  # boolean matrix over prop_indices
+        self.action_layer = NumpyActionLayer(self)
+        self.proposition_layer = NumpyPropositionLayer(self)
+
+    @staticmethod
+    def initial(matrices, initial_state):
+        """
+        Returns the first level of the graph, which only has the propositions of initial_state
+        """
+        prop_indices = matrices.columns(initial_state)
+        return NumpyLevel(matrices, np.zeros(0, dtype=np.intp), np.zeros((0, 0), dtype=bool),
+                          prop_indices, np.zeros((len(prop_indices), len(prop_indices)), dtype=bool))
+
+    def get_proposition_layer(self):
+        return self.proposition_layer
+
+    def get_action_layer(self):
+        return self.action_layer
+
+    def expand(self):
+        """
+        Returns the next level of the graph
+        """
+        m = self.matrices
+        props = self.prop_indices
+
+        # the actions whose preconditions are in the layer and are not pairwise mutex
+        in_layer = np.zeros(len(m.props), dtype=bool)
+        in_layer[props] = True
+        candidates = np.flatnonzero(~(m.pre & ~in_layer).any(axis=1))
+        pre = m.pre[candidates][:, props]
+        pre_mutex = boolean_product(pre, self.prop_mutex)  # the propositions mutex with a precondition
+        action_indices = candidates[~(pre_mutex & pre).any(axis=1)]
+
+        # interference (precomputed for the domain) and competing needs
+        pre = m.pre[action_indices]
+        add = m.add[action_indices]
+        interference = m.interference[np.ix_(action_indices, action_indices)]
+        pre_in_layer = pre[:, props]
+        competing_needs = boolean_product(boolean_product(pre_in_layer, self.prop_mutex), pre_in_layer.T)
+        action_mutex = interference | competing_needs
+        np.fill_diagonal(action_mutex, False)
+
+        # the propositions added by the actions, mutex if every pair of their producers is mutex
+        prop_indices = np.flatnonzero(add.any(axis=0))
+        producers = add[:, prop_indices]
+        non_mutex = ~action_mutex
+        prop_mutex = ~boolean_product(boolean_product(producers.T, non_mutex), producers)
+        np.fill_diagonal(prop_mutex, False)
+        return NumpyLevel(m, action_indices, action_mutex, prop_indices, prop_mutex)
+
+
+class MatrixMutexes(object):
+    """
+    The mutex pairs of a layer of a NumpyLevel, with the read API of MutexSet
+    """
+
+    def __init__(self, elements, index, matrix):
+        self.elements = elements  # the elements of the layer, in the order of the rows of matrix
+        self.index = index  # element id: row
+        self.matrix = matrix
+
+    def is_mutex(self, a, b):
+        i, j = self.index.get(a.id), self.index.get(b.id)
+        return i is not None and j is not None and bool(self.matrix[i, j])
+
+    def get_mask(self, a):
+        i = self.index.get(a.id)
+        if i is None:
+            return 0
+        mask = 0
+        for j in np.flatnonzero(self.matrix[i]):
+            mask |= 1 << self.elements[j].id
+        return mask
+
+    def pairs(self):
+        rows, columns = np.nonzero(np.triu(self.matrix))
+        for i, j in zip(rows, columns):
+            yield self.elements[i], self.elements[j]
+
+    def __contains__(self, pair):
+        return self.is_mutex(pair.a, pair.b)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.matrix)) // 2
+
+    def __iter__(self):
+        for a, b in self.pairs():
+            yield Pair(a, b)
+
+
+class NumpyActionLayer(object):
+    """
+    A view of the action layer of a NumpyLevel, with the read API of ActionLayer
+    """
+
+    def __init__(self, level):
+        matrices = level.matrices
+        self.level = level
+        self.action_list = [matrices.actions[i] for i in level.action_indices]
+        self.actions = frozenset(self.action_list)
+        self.mutexActions = MatrixMutexes(self.action_list, {action.id: k for k, action in enumerate(self.action_list)},
+                                          level.action_mutex)
+        self.producers = dict()  # Prop: the actions of the layer that add it, computed when first asked
+
+    def get_actions(self):
+        return self.actions
+
+    def get_mutex_actions(self):
+        return self.mutexActions
+
+    def is_mutex(self, pair):
+        return pair in self.mutexActions
+
+    def are_mutex(self, a1, a2):
+        return self.mutexActions.is_mutex(a1, a2)
+
+    def get_producers(self, prop):
+        """
+        Returns the actions of the layer that have prop in their add list, the noOp first
+        """
+        producers = self.producers.get(prop)
+        if producers is None:
+            matrices = self.level.matrices
+            column = matrices.prop_index.get(prop.id)
+            producers = []
+            if column is not None:
+                rows = self.level.action_indices[matrices.add[self.level.action_indices, column]]
+                producers = [matrices.actions[i] for i in rows]
+                producers.sort(key=lambda action: not action.is_noop())
+            self.producers[prop] = producers
+        return producers
+
+    def effect_exists(self, prop):
+        return len(self.get_producers(prop)) > 0
+
+
+class NumpyPropositionLayer(object):
+    """
+    A view of the proposition layer of a NumpyLevel, with the read API of PropositionLayer
+    """
+
+    def __init__(self, level):
+        matrices = level.matrices
+        self.level = level
+        self.prop_list = [matrices.props[j] for j in level.prop_indices]
+        self.propositions = frozenset(self.prop_list)
+        self.mutexPropositions = MatrixMutexes(self.prop_list, {prop.id: k for k, prop in enumerate(self.prop_list)},
+                                               level.prop_mutex)
+
+    def get_propositions(self):
+        return self.propositions
+
+    def is_mutex(self, p1, p2):
+        return self.mutexPropositions.is_mutex(p1, p2)
+
+    def get_mutex_props(self):
+        return self.mutexPropositions
+
+    def all_preconds_in_layer(self, action):
+        for pre in action.get_pre():
+            if pre not in self.propositions:
+                return False
+        return not any(self.is_mutex(p1, p2) for p1 in action.get_pre() for p2 in action.get_pre())
@@ -1,81 +1,172 @@
+import gzip
+import time
+
 from action import Action
 from proposition import Proposition
+from grounder import Grounder, Schema
+from id_registry import IdRegistry
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+class LiftedDomainError(ValueError):
+    """
+    Raised when a lifted domain is parsed without a problem, its schemas are only grounded with one
+    """
+
+
+def open_text(file_name):
+    """
+    Opens a domain or problem file for reading text, the file may be compressed with gzip
+    """
+    with open(file_name, 'rb') as f:
+        compressed = f.read(2) == GZIP_MAGIC
+    if compressed:
+        return gzip.open(file_name, 'rt')
+    return open(file_name, 'r')
 
 
 class PgParser:
     """
     A utility class for parsing the domain and problem.
+    The domain file is read once, line by line: the "Propositions:" header is followed by a line of names,
+    and each action is a "Name:" line followed by its pre, add and delete lines (a blank one is an empty list).
+    Every name is resolved through propositions_by_name, so each proposition is a single object
+    shared by the actions, the initial state and the goal.
+    The ids of the propositions and of the actions (noOps included, see create_noop) are interned
+    in the registries of the parser, so they are dense over the domain and the problem.
+    A domain may also be lifted: a "Types:" section with a "type: object1 object2 ..." line per type,
+    and "Schema:" lines followed by their pre, add and delete lines (see grounder.Schema).
+    The actions of the schemas are grounded in memory, only the ones reachable from the initial state
+    of the problem (see Grounder), so a lifted domain is parsed together with its problem.
+    parse_time is the total time spent reading the files, in seconds
     """
 
-    def __init__(self, domain_file, problem_file):
+    def __init__(self, domain_file, problem_file, propositions=None):
         """
         Constructor
+        propositions are the propositions of the domain when it is already parsed (see DomainContext),
+        the problem is then parsed into them and into their ids
         """
         self.domain_file = domain_file
         self.problem_file = problem_file
+        self.propositions_by_name = dict()  # Prop_Name: Prop, so that each name is parsed into a single object
+        if propositions is not None:
+            self.propositions_by_name.update((prop.name, prop) for prop in propositions)
+        self.proposition_ids = IdRegistry({name: prop.id for name, prop in self.propositions_by_name.items()})
+        self.action_ids = IdRegistry()
+        self.parse_time = 0.0
+        self.types = dict()  # type: its objects, for the schemas of a lifted domain
+        self.schemas = []
+        self.problem = None  # (init, goal), once parsed
 
     def parse_actions_and_propositions(self):
+        start = time.time()
         propositions = []
-        f = open(self.domain_file, 'r')
-        _ = f.readline()
-        proposition_line = f.readline()
-        words = [word.rstrip() for word in proposition_line.split(" ") if len(word.rstrip()) > 0]
-        for i in range(0, len(words)):
-            propositions.append(Proposition(words[i]))
         actions = []
-        f = open(self.domain_file, 'r')
-        line = f.readline()
-        while line != '':
-            words = [word.rstrip() for word in line.split(" ") if len(word.rstrip()) > 0]
-            if words[0] == 'Name:':
-                name = words[1]
-                line = f.readline()
-                precond = []
-                add = []
-                delete = []
-                words = [word.rstrip() for word in line.split(" ") if len(word.rstrip()) > 0]
-                for i in range(1, len(words)):
-                    precond.append(Proposition(words[i]))
-                line = f.readline()
-                words = [word.rstrip() for word in line.split(" ") if len(word.rstrip()) > 0]
-                for i in range(1, len(words)):
-                    add.append(Proposition(words[i]))
-                line = f.readline()
-                words = [word.rstrip() for word in line.split(" ") if len(word.rstrip()) > 0]
-                for i in range(1, len(words)):
-                    delete.append(Proposition(words[i]))
-                act = Action(name, precond, add, delete)
-                for prop in add:
-                    self.find_prop_by_name(prop, propositions).add_producer(act)
-                actions.append(act)
-            line = f.readline()
-
-        for a in actions:
-            new_pre = [p for p in propositions if p.name in [q.name for q in a.pre]]
-            new_add = [p for p in propositions if p.name in [q.name for q in a.add]]
-            new_delete = [p for p in propositions if p.name in [q.name for q in a.delete]]
-            a.pre = new_pre
-            a.add = new_add
-            a.delete = new_delete
+        current = None  # [name or Schema header, pre, add, delete] of the action being read
+        field = 0  # the index in current of the list of the next line (1 for pre, 2 for add, 3 for delete)
+        in_types = False
+        with open_text(self.domain_file) as f:
+            f.readline()  # Propositions:
+            propositions.extend(self.get_proposition(word) for word in f.readline().split())
+            for line in f:
+                words = line.split()
+                if current is not None:
+                    # the pre, add and delete lines follow the name in this order, whatever their label,
+                    # a blank line is an empty list
+                    if words and words[0] in ('Name:', 'Schema:'):
+                        raise ValueError("%s: the action %s has no %s line" % (
+                            self.domain_file, action_name(current[0]), ('pre', 'add', 'delete')[field - 1]))
+                    current[field].extend(words[1:])
+                    field += 1
+                    if field == 4:
+                        self.add_parsed_action(current, actions)
+                        current = None
+                elif not words:
+                    continue
+                elif words[0] in ('Name:', 'Schema:'):
+                    current = [words[1] if words[0] == 'Name:' else words[1:], [], [], []]
+                    field = 1
+                    in_types = False
+                elif words[0] in ('Types:', 'Actions:'):
+                    in_types = words[0] == 'Types:'
+                elif in_types and words[0].endswith(':'):
+                    self.types.setdefault(words[0][:-1], []).extend(words[1:])
+            if current is not None:  # the lines missing at the end of the file are empty
+                self.add_parsed_action(current, actions)
+
+        if self.schemas:
+            actions.extend(self.ground())
+        declared = set(propositions)
+        # propositions used by an action but missing from the Propositions line
+        propositions.extend(prop for prop in self.propositions_by_name.values() if prop not in declared)
+        self.parse_time += time.time() - start
 
         return [actions, propositions]
 
-    @staticmethod
-    def find_prop_by_name(name, propositions):
-        for prop in propositions:
-            if prop == name:
-                return prop
+    def add_parsed_action(self, current, actions):
+        """
+        Adds the action read as current, [name, pre, add, delete] with the names of its propositions, to actions,
+        or the schema read as current, [the words of its header, pre, add, delete], to self.schemas
+        """
+        if isinstance(current[0], list):
+            self.schemas.append(Schema(*current))
+        else:
+            actions.append(self.create_action(current[0], *[
+                [self.get_proposition(word) for word in names] for names in current[1:]]))
+
+    def create_action(self, name, precond, add, delete):
+        act = Action(name, precond, add, delete, False, self.action_ids.get(name))
+        for prop in add:
+            prop.add_producer(act)
+        return act
+
+    def create_noop(self, prop):
+        """
+        Returns the noOp of the proposition prop, which is not added to its producers
+        """
+        return Action(prop.name, [prop], [prop], [], True, self.action_ids.get(prop.name))
+
+    def ground(self):
+        """
+        Returns the actions of the schemas that are reachable from the initial state of the problem
+        """
+        if self.problem_file is None:
+            raise LiftedDomainError("%s is a lifted domain, it can only be grounded with a problem" % self.domain_file)
+        init, _ = self.parse_problem()
+        grounder = Grounder(self.schemas, self.types)
+        actions = []
+        for name, precond, add, delete in grounder.ground([prop.name for prop in init]):
+            actions.append(self.create_action(name, [self.get_proposition(atom) for atom in precond],
+                                              [self.get_proposition(atom) for atom in add],
+                                              [self.get_proposition(atom) for atom in delete]))
+        return actions
+
+    def get_proposition(self, name):
+        """
+        Returns the single proposition object of the given name
+        """
+        prop = self.propositions_by_name.get(name)
+        if prop is None:
+            prop = Proposition(name, self.proposition_ids.get(name))
+            self.propositions_by_name[name] = prop
+        return prop
 
     def parse_problem(self):
-        init = []
-        goal = []
-        f = open(self.problem_file, 'r')
-        line = f.readline()
-        words = [word.rstrip() for word in line.split(" ") if len(word.rstrip()) > 0]
-        for i in range(2, len(words)):
-            init.append(Proposition(words[i]))
-        line = f.readline()
-        words = [word.rstrip() for word in line.split(" ") if len(word.rstrip()) > 0]
-        for i in range(2, len(words)):
-            goal.append(Proposition(words[i]))
-        return init, goal
+        if self.problem is None:
+            start = time.time()
+            with open_text(self.problem_file) as f:
+                init = [self.get_proposition(word) for word in f.readline().split()[2:]]  # Initial state: ...
+                goal = [self.get_proposition(word) for word in f.readline().split()[2:]]  # Goal state: ...
+            self.problem = (init, goal)
+            self.parse_time += time.time() - start
+        init, goal = self.problem
+        return list(init), list(goal)
+
+
+def action_name(header):
+    """
+    Returns the name of an action, or of a schema from the words of its header
+    """
+    return header if isinstance(header, str) else header[0]
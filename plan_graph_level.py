@@ -1,9 +1,11 @@
-from itertools import product
-from typing import Set, Dict
+from itertools import chain, combinations
 
 from action_layer import ActionLayer
-from action import Action
-from util import Pair
+from action import Action, to_mask
+from mutex_set import MutexSet
+from domain_context import DomainContext
+from independent_actions import IndependentActions
+from instrumentation import run_phases
 from proposition import Proposition
 from proposition_layer import PropositionLayer
 
@@ -12,27 +14,14 @@ class PlanGraphLevel(object):
     """
     A class for representing a level in the plan graph.
     For each level i, the PlanGraphLevel consists of the actionLayer and propositionLayer at this level in this order!
+    The actions and the independent actions of the domain are read from the DomainContext of the level
     """
-    independent_actions = set()  # updated to the independent_actions of the problem (graph_plan.py line 32)
-    actions = []  # updated to the actions of the problem (graph_plan.py line 33 and planning_problem.py line 36)
-    props = []  # updated to the propositions of the problem (graph_plan.py line 34 and planning_problem.py line 36)
 
-    @staticmethod
-    def set_independent_actions(independent_actions):
-        PlanGraphLevel.independent_actions = independent_actions
-
-    @staticmethod
-    def set_actions(actions):
-        PlanGraphLevel.actions = actions
-
-    @staticmethod
-    def set_props(props):
-        PlanGraphLevel.props = props
-
-    def __init__(self):
+    def __init__(self, context: DomainContext):
         """
         Constructor
         """
+        self.context = context  # the domain of the graph, shared by all its levels (see domain_context.py)
         self.action_layer = ActionLayer()  # see action_layer.py
         self.proposition_layer = PropositionLayer()  # see proposition_layer.py
 
@@ -61,15 +50,12 @@ class PlanGraphLevel(object):
         if all the preconditions of action are in the previous propositions layer
         self.actionLayer.addAction(action) adds action to the current action layer
         """
-        all_actions = PlanGraphLevel.actions
+        all_actions = self.context.actions
         for action in all_actions:
-            if not previous_proposition_layer.all_preconds_in_layer(action):
-                continue
-            proposition_pairs = product(action.get_pre(), action.get_pre())
-            if all(not previous_proposition_layer.is_mutex(p1, p2) for p1, p2 in proposition_pairs):
+            if previous_proposition_layer.all_preconds_in_layer(action):
                 self.action_layer.add_action(action)
 
-    def update_mutex_actions(self, previous_layer_mutex_proposition: Set[Pair]) -> None:
+    def update_mutex_actions(self, previous_layer_mutex_proposition: MutexSet) -> None:
         """
         Updates the mutex set in self.action_layer,
         given the mutex proposition from the previous layer.
@@ -80,9 +66,9 @@ class PlanGraphLevel(object):
         Note that an action is *not* mutex with itself
         """
         current_layer_actions = self.action_layer.get_actions()
-        action_pairs = product(current_layer_actions, current_layer_actions)
+        action_pairs = combinations(current_layer_actions, 2)  # mutex is symmetric, check each pair once
         for a1, a2 in action_pairs:
-            if mutex_actions(a1, a2, previous_layer_mutex_proposition):
+            if mutex_actions(a1, a2, previous_layer_mutex_proposition, self.context.independent_actions):
                 self.action_layer.add_mutex_actions(a1, a2)
 
     def update_proposition_layer(self) -> None:
@@ -92,23 +78,14 @@ class PlanGraphLevel(object):
         don't forget to update the producers list!
         Note that same proposition in different layers might have different producers lists,
         hence you should create two different instances.
-        current_layer_actions is the set of all the actions in the current layer.
-        You might want to use those functions:
-        dict() creates a new dictionary that might help to keep track on the propositions that you've
-               already added to the layer
+        The propositions of the layer and their producers are read from the producer index of the action layer,
+        which is built while the actions are added to it.
         self.proposition_layer.add_proposition(prop) adds the proposition prop to the current layer
         """
-        current_layer_actions = self.action_layer.get_actions()
-        propositions: Dict[str: Proposition] = dict()  # Prop_Name: Prop
-        for action in current_layer_actions:
-            for prop in action.get_add():
-                name = prop.get_name()
-                if name not in propositions:
-                    propositions[name] = Proposition(name)
-                if action not in propositions[name].get_producers():
-                    propositions[name].add_producer(action)
-        for prop in propositions.values():
-            self.proposition_layer.add_proposition(prop)
+        for prop, producers in self.action_layer.producers.items():
+            layer_prop = Proposition(prop.get_name(), prop.get_id())
+            layer_prop.set_producers(list(producers))
+            self.proposition_layer.add_proposition(layer_prop)
 
     def update_mutex_proposition(self) -> None:
         """
@@ -120,13 +97,13 @@ class PlanGraphLevel(object):
         to the mutex set of the current layer
         """
         current_layer_propositions = self.proposition_layer.get_propositions()
-        current_layer_mutex_actions: Set[Pair] = self.action_layer.get_mutex_actions()
-        proposition_pairs = product(current_layer_propositions, current_layer_propositions)
+        current_layer_mutex_actions: MutexSet = self.action_layer.get_mutex_actions()
+        proposition_pairs = combinations(current_layer_propositions, 2)  # mutex is symmetric, check each pair once
         for p1, p2 in proposition_pairs:
             if mutex_propositions(p1, p2, current_layer_mutex_actions):
                 self.proposition_layer.add_mutex_prop(p1, p2)
 
-    def expand(self, previous_layer) -> None:
+    def expand(self, previous_layer, phase_times=None) -> None:
         """
         Your algorithm should work as follows:
         First, given the propositions and the list of mutex propositions from the previous layer,
@@ -134,13 +111,86 @@ class PlanGraphLevel(object):
         Then, set the mutex action in the action layer.
         Finally, given all the actions in the current layer,
         set the propositions and their mutex relations in the proposition layer.
+        If phase_times is a dict, the seconds spent in each of these phases are added to it (see run_phases)
         """
         previous_proposition_layer: PropositionLayer = previous_layer.get_proposition_layer()
-        previous_layer_mutex_proposition: Set[Pair] = previous_proposition_layer.get_mutex_props()
-        self.update_action_layer(previous_proposition_layer)
-        self.update_mutex_actions(previous_layer_mutex_proposition)
-        self.update_proposition_layer()
-        self.update_mutex_proposition()
+        previous_layer_mutex_proposition: MutexSet = previous_proposition_layer.get_mutex_props()
+        run_phases((('update_action_layer', self.update_action_layer, (previous_proposition_layer,)),
+                    ('update_mutex_actions', self.update_mutex_actions, (previous_layer_mutex_proposition,)),
+                    ('update_proposition_layer', self.update_proposition_layer, ()),
+                    ('update_mutex_proposition', self.update_mutex_proposition, ())), phase_times)
+
+    def expand_incremental(self, previous_layer, phase_times=None) -> None:
+        """
+        Same result as expand, but exploits the monotonicity of the planning graph:
+        actions and propositions are only added from one level to the next, and mutexes only disappear.
+        Hence the actions and the propositions of the previous level are carried forward,
+        only the actions that were not enabled in the previous level are tested,
+        and only the pairs that were mutex in the previous level (or that involve a new element) are checked.
+        previous_layer must itself be the result of expanding the level before it (or be the first level).
+        The phases are timed in phase_times under the names of the phases of expand
+        """
+        previous_proposition_layer: PropositionLayer = previous_layer.get_proposition_layer()
+        previous_action_layer: ActionLayer = previous_layer.get_action_layer()
+        run_phases((('update_action_layer', self.update_action_layer_incremental,
+                     (previous_action_layer, previous_proposition_layer)),
+                    ('update_mutex_actions', self.update_mutex_actions_incremental,
+                     (previous_action_layer, previous_proposition_layer.get_mutex_props())),
+                    ('update_proposition_layer', self.update_proposition_layer, ()),
+                    ('update_mutex_proposition', self.update_mutex_proposition_incremental,
+                     (previous_proposition_layer,))), phase_times)
+
+    def update_action_layer_incremental(self, previous_action_layer: ActionLayer,
+                                        previous_proposition_layer: PropositionLayer) -> None:
+        """
+        Like update_action_layer, but the actions of the previous action layer are kept without testing them again
+        """
+        previous_actions = previous_action_layer.get_actions()
+        for action in previous_actions:
+            self.action_layer.add_action(action)
+        for action in self.context.actions:
+            if action not in previous_actions and previous_proposition_layer.all_preconds_in_layer(action):
+                self.action_layer.add_action(action)
+
+    def update_mutex_actions_incremental(self, previous_action_layer: ActionLayer,
+                                         previous_layer_mutex_proposition: MutexSet) -> None:
+        """
+        Like update_mutex_actions, but two actions that were not mutex in the previous action layer stay non mutex.
+        A pair that was mutex is checked again, since the propositions mutex that caused competing needs
+        might have disappeared, and a new action is checked against all the actions in the layer
+        """
+        previous_actions = previous_action_layer.get_actions()
+        for a1, a2 in previous_action_layer.get_mutex_actions().pairs():
+            if mutex_actions(a1, a2, previous_layer_mutex_proposition, self.context.independent_actions):
+                self.action_layer.add_mutex_actions(a1, a2)
+        current_layer_actions = self.action_layer.get_actions()
+        new_actions = [action for action in current_layer_actions if action not in previous_actions]
+        old_actions = [action for action in current_layer_actions if action in previous_actions]
+        for i, a1 in enumerate(new_actions):
+            for a2 in chain(old_actions, new_actions[i + 1:]):
+                if mutex_actions(a1, a2, previous_layer_mutex_proposition, self.context.independent_actions):
+                    self.action_layer.add_mutex_actions(a1, a2)
+
+    def update_mutex_proposition_incremental(self, previous_proposition_layer: PropositionLayer) -> None:
+        """
+        Like update_mutex_proposition, but two propositions that were not mutex in the previous
+        proposition layer stay non mutex. A pair that was mutex is checked again with the new producers,
+        and a new proposition is checked against all the propositions in the layer
+        """
+        current_layer_mutex_actions: MutexSet = self.action_layer.get_mutex_actions()
+        # the propositions of this layer by id, the previous layer holds different instances with other producers
+        current_layer_propositions = {prop.id: prop for prop in self.proposition_layer.get_propositions()}
+        previous_propositions = previous_proposition_layer.get_propositions()
+        for p1, p2 in previous_proposition_layer.get_mutex_props().pairs():
+            p1, p2 = current_layer_propositions[p1.id], current_layer_propositions[p2.id]
+            if mutex_propositions(p1, p2, current_layer_mutex_actions):
+                self.proposition_layer.add_mutex_prop(p1, p2)
+        new_propositions = [prop for prop in current_layer_propositions.values() if prop not in previous_propositions]
+        old_propositions = [prop for prop in current_layer_propositions.values() if prop in previous_propositions]
+        for i, p1 in enumerate(new_propositions):
+            for p2 in chain(old_propositions, new_propositions[i + 1:]):
+                if mutex_propositions(p1, p2, current_layer_mutex_actions):
+                    self.proposition_layer.add_mutex_prop(p1, p2)
 
     def expand_without_mutex(self, previous_layer) -> None:
         """
@@ -152,39 +202,39 @@ class PlanGraphLevel(object):
         self.update_proposition_layer()
 
 
-def mutex_actions(a1: Action, a2: Action, mutex_props: Set[Pair]) -> bool:
+def mutex_actions(a1: Action, a2: Action, mutex_props: MutexSet, independent_actions: IndependentActions) -> bool:
     """
     This function returns true if a1 and a2 are mutex actions.
-    We first check whether a1 and a2 are in PlanGraphLevel.independent_actions,
+    We first check whether a1 and a2 are in independent_actions (the one of the DomainContext),
     this is the list of all the independent pair of actions (according to your implementation in question 1).
     If not, we check whether a1 and a2 have competing needs
     """
     if a1 == a2:
         return False
 
-    if Pair(a1, a2) not in PlanGraphLevel.independent_actions:
+    if not independent_actions.is_independent(a1, a2):
         return True
     return have_competing_needs(a1, a2, mutex_props)
 
 
-def have_competing_needs(a1: Action, a2: Action, mutex_props: Set[Pair]) -> bool:
+def have_competing_needs(a1: Action, a2: Action, mutex_props: MutexSet) -> bool:
     """
     Complete code for deciding whether actions a1 and a2 have competing needs,
-    given the mutex proposition from previous level (list of pairs of propositions).
-    Hint: for propositions p  and q, the command  "Pair(p, q) in mutex_props"
-          returns true if p and q are mutex in the previous level
+    given the mutex proposition from previous level (set of pairs of propositions).
+    A precondition p of a1 is mutex with a precondition of a2 iff
+    the bitset of the propositions mutex with p intersects a2.pre_mask
     """
-    proposition_pairs = product(a1.get_pre(), a2.get_pre())
-    return any(Pair(p, q) in mutex_props for p, q in proposition_pairs)
+    pre_mask = a2.pre_mask
+    return any(mutex_props.get_mask(p) & pre_mask for p in a1.get_pre())
 
 
-def mutex_propositions(prop1: Proposition, prop2: Proposition, mutex_actions_list: Set[Pair]) -> bool:
+def mutex_propositions(prop1: Proposition, prop2: Proposition, mutex_actions_list: MutexSet) -> bool:
     """
     complete code for deciding whether two propositions are mutex,
     given the mutex action from the current level (set of pairs of actions).
     Your update_mutex_proposition function should call this function
-    You might want to use this function:
-    prop1.get_producers() returns the set of all the possible actions in the layer that have prop1 on their add list
+    prop1 and prop2 are mutex iff every producer of prop1 is mutex with every producer of prop2,
+    that is the bitset of the actions mutex with each producer of prop1 contains all the producers of prop2
     """
-    actions_pairs = product(prop1.get_producers(), prop2.get_producers())
-    return all(Pair(a1, a2) in mutex_actions_list for a1, a2 in actions_pairs)
+    producers_mask = to_mask(prop2.get_producers())
+    return all(mutex_actions_list.get_mask(a1) & producers_mask == producers_mask for a1 in prop1.get_producers())
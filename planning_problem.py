@@ -1,55 +1,97 @@
-from plan_graph_level import PlanGraphLevel
+import time
+
 from pgparser import PgParser
-from action import Action
-from proposition_layer import PropositionLayer
+from action import Action, to_mask
 from proposition import Proposition
-from typing import FrozenSet, List, Tuple
+from domain_cache import DomainCache
+from heuristic_cache import HeuristicCache
+from instrumentation import Instrumentation, profile_call
+from relaxed_reachability import RelaxedReachability, state_ids
+from successor_generator import SuccessorGenerator
+from typing import FrozenSet, List, Tuple, Union
 
-try:
-    from search import SearchProblem
-    from search import a_star_search
+from search import SearchProblem, SearchStatistics, best_first_search
+from budget import add_budget_arguments, budget_from_args
 
-except:
-    try:
-        from CPF.search import SearchProblem
-        from CPF.search import a_star_search
-    except:
-        from CPF.search_win_34 import SearchProblem
-        from CPF.search_win_34 import a_star_search
+State = Union[FrozenSet[Proposition], int]  # a frozenset of propositions, or its bitmask in compiled mode
 
 
-class PlanningProblem:
-    def __init__(self, domain_file, problem_file):
+class PlanningProblem(SearchProblem):
+    def __init__(self, domain_file, problem_file, compiled=False, helpful_actions=False, helpful_fallback=True,
+                 domain_cache=None, context=None):
         """
         Constructor
+        If compiled is true, states are represented as integer bitmasks over the proposition ids
+        instead of frozensets of propositions (see compile_states)
+        If helpful_actions is true, get_successors only returns the successors reached by helpful actions
+        (see prune_unhelpful), and all of them for a state without helpful successors if helpful_fallback is true
+        domain_cache is a DomainCache to load the domain from, instead of parsing it
+        context is a DomainContext of the domain to use instead of reading domain_file (see DomainContext.load)
         """
-        p = PgParser(domain_file, problem_file)
-        self.actions, self.propositions = p.parse_actions_and_propositions()
+        p = PgParser(domain_file, problem_file, context.propositions if context is not None else None)
+        if context is not None:
+            self.actions, self.propositions = list(context.actions), list(context.propositions)
+        elif domain_cache is not None:
+            start = time.time()
+            compiled_domain = domain_cache.load_grounded(domain_file)
+            if compiled_domain is not None:
+                with compiled_domain:
+                    self.actions, self.propositions = compiled_domain.create(p)
+                p.parse_time += time.time() - start  # loading the compiled domain replaces parsing it
+            else:  # a lifted domain is grounded with the problem
+                self.actions, self.propositions = p.parse_actions_and_propositions()
+        else:
+            self.actions, self.propositions = p.parse_actions_and_propositions()
         # list of all the actions and list of all the propositions
 
         initial_state, goal = p.parse_problem()
         # the initial state and the goal state are lists of propositions
+        self.parse_time = p.parse_time  # seconds spent reading the domain and problem files
 
         self.initialState = frozenset(initial_state)
         self.goal = frozenset(goal)
 
-        self.create_noops()
-        # creates noOps that are used to propagate existing propositions from one layer to the next
-
-        PlanGraphLevel.set_actions(self.actions)
-        PlanGraphLevel.set_props(self.propositions)
+        if context is None:
+            self.create_noops(p)
+            # creates noOps that are used to propagate existing propositions from one layer to the next
         self.expanded = 0
 
-    def get_start_state(self) -> FrozenSet[Proposition]:
+        self.successor_generator = SuccessorGenerator(self.actions)  # the applicable actions of a state
+
+        self.relaxation = RelaxedReachability(self.actions)  # for the max_level and level_sum heuristics
+        self.goal_ids = [prop.id for prop in self.goal]
+        self.helpful_actions = helpful_actions
+        self.helpful_fallback = helpful_fallback
+        self.helpful = None  # (state, bitset of the ids of its helpful actions), the last one ff_heuristic evaluated
+
+        self.compiled = compiled
+        self.initial_mask = 0
+        self.goal_mask = to_mask(self.goal)  # also keys the goal in a HeuristicCache
+        if compiled:
+            self.compile_states()
+
+    def compile_states(self):
+        """
+        Represents the states as bitmasks over the proposition ids (see Proposition.id),
+        so that a state is a single int and applying an action is a few integer operations
+        with the precomputed bitmasks of the action (see Action.pre_mask)
+        """
+        self.initial_mask = to_mask(self.initialState)
+
+    def get_start_state(self) -> State:
+        if self.compiled:
+            return self.initial_mask
         return self.initialState
 
-    def is_goal_state(self, state: FrozenSet[Proposition]) -> bool:
+    def is_goal_state(self, state: State) -> bool:
         """
         Hint: you might want to take a look at goal_state_not_in_prop_layer function
         """
+        if self.compiled:
+            return state & self.goal_mask == self.goal_mask
         return not self.goal_state_not_in_prop_layer(state)
 
-    def get_successors(self, state: FrozenSet[Proposition]) -> List[Tuple[FrozenSet[Proposition], Action, int]]:
+    def get_successors(self, state: State) -> List[Tuple[State, Action, int]]:
         """
         For a given state, this should return a list of triples,
         (successor, action, step_cost), where 'successor' is a
@@ -61,17 +103,42 @@ class PlanningProblem:
         a.all_preconds_in_list(l) returns true if the preconditions of a are in l
 
         Note that a state *must* be hashable!! Therefore, you might want to represent a state as a frozenset
+        In compiled mode the state and its successors are bitmasks (see compile_states)
+        The applicable actions are found by a decision tree over their preconditions (see successor_generator.py)
         """
         self.expanded += 1
         step_cost = 1
         successors = []
-        for action in self.actions:
-            if action.all_preconds_in_list(state) and not action.is_noop():
-                successor = frozenset(action.get_add() + [prop for prop in state if prop not in action.get_delete()])
+        applicable = self.successor_generator.get_applicable(state)
+        if self.compiled:
+            for action in applicable:
+                successors.append(((state & ~action.delete_mask) | action.add_mask, action, step_cost))
+        else:
+            for action in applicable:
+                successor = (state - action.delete_set) | action.add_set
                 successors.append((successor, action, step_cost))
-
+        if self.helpful_actions:
+            return self.prune_unhelpful(state, successors)
         return successors
 
+    def prune_unhelpful(self, state: State, successors):
+        """
+        Keeps the successors reached by a helpful action of the state (see RelaxedReachability.relaxed_plan).
+        Only the helpful actions of the last state evaluated by ff_heuristic are kept, which is the state expanded
+        by a lazy search (evaluated when popped), so that states generated but never expanded keep no memory.
+        Otherwise they are computed here. If no successor is helpful and helpful_fallback is true,
+        all the successors are kept. The pruning is not complete: without the fallback a solvable problem
+        might not be solved
+        """
+        if self.helpful is not None and self.helpful[0] == state:
+            helpful = self.helpful[1]
+        else:
+            _, helpful = self.relaxation.relaxed_plan(state_ids(state), self.goal_ids)
+        pruned = [successor for successor in successors if helpful >> successor[1].id & 1]
+        if not pruned and self.helpful_fallback:
+            return successors
+        return pruned
+
     @staticmethod
     def get_cost_of_actions(actions):
         return len(actions)
@@ -86,91 +153,53 @@ class PlanningProblem:
                 return True
         return False
 
-    def create_noops(self):
+    def create_noops(self, parser):
         """
-        Creates the noOps that are used to propagate propositions from one layer to the next
+        Creates the noOps that are used to propagate propositions from one layer to the next,
+        with ids from the registry of the actions of parser
         """
         for prop in self.propositions:
-            name = prop.name
-            precon = []
-            add = []
-            precon.append(prop)
-            add.append(prop)
-            delete = []
-            act = Action(name, precon, add, delete, True)
-            self.actions.append(act)
+            self.actions.append(parser.create_noop(prop))
 
 
-def max_level(state: FrozenSet[Proposition], planning_problem: PlanningProblem) -> float:
+def max_level(state: State, planning_problem: PlanningProblem) -> float:
     """
     The heuristic value is the number of layers required to expand all goal propositions.
     If the goal is not reachable from the state your heuristic should return float('inf')
-    A good place to start would be:
+    The level in which a proposition first appears in the planning graph without mutexes is its h_max cost,
+    computed by the relaxed reachability engine without building the graph (see relaxed_reachability.py)
     """
-    prop_layer_init = PropositionLayer()  # create a new proposition layer
-    for prop in state:
-        prop_layer_init.add_proposition(prop)  # update the proposition layer with the propositions of the state
-    pg_init = PlanGraphLevel()  # create a new plan graph level (level is the action layer and the propositions layer)
-    pg_init.set_proposition_layer(prop_layer_init)  # update the new plan graph level with the the proposition layer`
-    level = 0
-    graph: List[PlanGraphLevel] = [pg_init]
-    current_state = frozenset(pg_init.get_proposition_layer().get_propositions())
-    while not planning_problem.is_goal_state(current_state):
-        if is_fixed(graph, level):
-            return float('inf')
-        level += 1
-        pg_next = PlanGraphLevel()
-        pg_next.expand_without_mutex(graph[level - 1])
-        graph.append(pg_next)
-        current_state = frozenset(pg_next.get_proposition_layer().get_propositions())
-    return level
-
-
-def level_sum(state: FrozenSet[Proposition], planning_problem: PlanningProblem) -> float:
+    return planning_problem.relaxation.max_level(state_ids(state), planning_problem.goal_ids)
+
+
+def level_sum(state: State, planning_problem: PlanningProblem) -> float:
     """
     The heuristic value is the sum of sub-goals level they first appeared.
     If the goal is not reachable from the state your heuristic should return float('inf')
     """
-    prop_layer_init = PropositionLayer()  # create a new proposition layer
-    for prop in state:
-        prop_layer_init.add_proposition(prop)  # update the proposition layer with the propositions of the state
-    pg_init = PlanGraphLevel()  # create a new plan graph level (level is the action layer and the propositions layer)
-    pg_init.set_proposition_layer(prop_layer_init)  # update the new plan graph level with the the proposition layer`
-    level = 0
-    graph: List[PlanGraphLevel] = [pg_init]
-
-    current_state = set(pg_init.get_proposition_layer().get_propositions())
-    levels_sum = 0
-
-    remaining_sub_goals = set(planning_problem.goal) - current_state
-    while not planning_problem.is_goal_state(current_state):
-        pg_next = PlanGraphLevel()
-        pg_next.expand_without_mutex(graph[level])
-        graph.append(pg_next)
-        level += 1
-
-        if is_fixed(graph, level):
-            return float('inf')
+    return planning_problem.relaxation.level_sum(state_ids(state), planning_problem.goal_ids)
 
-        current_state = frozenset(pg_next.get_proposition_layer().get_propositions())
-        for prop in remaining_sub_goals:
-            if prop in current_state:
-                levels_sum += level
 
-        remaining_sub_goals -= current_state
-
-    return levels_sum
+def additive_cost(state: State, planning_problem: PlanningProblem) -> float:
+    """
+    The h_add heuristic: the sum of the costs of the sub-goals, where the cost of a proposition is
+    1 + the sum of the costs of the preconditions of its cheapest producer.
+    If the goal is not reachable from the state returns float('inf')
+    """
+    return planning_problem.relaxation.additive_cost(state_ids(state), planning_problem.goal_ids)
 
 
-def is_fixed(graph, level):
+def ff_heuristic(state: State, planning_problem: PlanningProblem) -> float:
     """
-    Checks if we have reached a fixed point,
-    i.e. each level we'll expand would be the same, thus no point in continuing
+    The FF heuristic: the number of actions of a relaxed plan (a plan that ignores the delete lists)
+    extracted from the relaxed planning graph. If the problem prunes unhelpful successors,
+    the helpful actions found with the relaxed plan are kept for get_successors (see prune_unhelpful).
+    If the goal is not reachable from the state returns float('inf')
     """
-    if level == 0:
-        return False
-    return len(graph[level].get_proposition_layer().get_propositions()) == len(
-        graph[level - 1].get_proposition_layer().get_propositions())
+    plan, helpful = planning_problem.relaxation.relaxed_plan(state_ids(state), planning_problem.goal_ids)
+    if planning_problem.helpful_actions:
+        planning_problem.helpful = (state, helpful)
+    return float('inf') if plan is None else len(plan)
 
 
 def null_heuristic(*args, **kwargs):
@@ -178,34 +207,65 @@ def null_heuristic(*args, **kwargs):
 
 
 if __name__ == '__main__':
-    import sys
-    import time
-
-    if len(sys.argv) != 1 and len(sys.argv) != 4:
-        print("Usage: PlanningProblem.py domainName problemName heuristicName(max, sum or zero)")
-        exit()
-    domain = 'dwrDomain.txt'
-    problem = 'dwrProblem.txt'
-    heuristic = null_heuristic
-    if len(sys.argv) == 4:
-        domain = str(sys.argv[1])
-        problem = str(sys.argv[2])
-        if str(sys.argv[3]) == 'max':
-            heuristic = max_level
-        elif str(sys.argv[3]) == 'sum':
-            heuristic = level_sum
-        elif str(sys.argv[3]) == 'zero':
-            heuristic = null_heuristic
-        else:
-            print("Usage: planning_problem.py domain_name problem_name heuristic_name[max, sum, zero]")
-            exit()
-
-    prob = PlanningProblem(domain, problem)
-    start = time.time()
-    plan = a_star_search(prob, heuristic)
-    elapsed = time.time() - start
+    import argparse
+
+    heuristics = {'max': max_level, 'sum': level_sum, 'add': additive_cost, 'ff': ff_heuristic,
+                  'zero': null_heuristic}
+    parser = argparse.ArgumentParser(description="Solves a planning problem with A*")
+    parser.add_argument('domain', nargs='?', default='dwrDomain.txt', help="domain file (default: %(default)s)")
+    parser.add_argument('problem', nargs='?', default='dwrProblem.txt', help="problem file (default: %(default)s)")
+    parser.add_argument('heuristic', nargs='?', choices=sorted(heuristics), default='zero',
+                        help="heuristic (default: %(default)s)")
+    parser.add_argument('cache_size', nargs='?', type=int,
+                        help="memoize the heuristic values, evicting the least recently used beyond cache_size")
+    parser.add_argument('--search', choices=('astar', 'wastar', 'gbfs'), default='astar',
+                        help="A*, weighted A* or greedy best-first search (default: %(default)s)")
+    parser.add_argument('--weight', type=float, default=2.0,
+                        help="the weight of the heuristic in weighted A* (default: %(default)s)")
+    parser.add_argument('--lazy', action='store_true',
+                        help="evaluate the heuristic of a state when it is popped instead of when it is generated")
+    parser.add_argument('--helpful', action='store_true',
+                        help="only expand the successors reached by helpful actions (see ff_heuristic)")
+    parser.add_argument('--no-fallback', action='store_true',
+                        help="with --helpful, do not expand all the successors of a state without helpful ones")
+    parser.add_argument('--domain-cache', nargs='?', const='', metavar='DIR',
+                        help="load the compiled domain from the cache in DIR (default: ~/.cache/graphplan), "
+                             "compiling it first if needed")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="write the search counters, with the heuristic and successor times, to a JSON file")
+    parser.add_argument('--profile', metavar='FILE', help="run the search under cProfile and write its profile to FILE")
+    add_budget_arguments(parser)
+    args = parser.parse_args()
+
+    heuristic = heuristics[args.heuristic]
+    cache = None
+    if args.cache_size is not None:
+        cache = HeuristicCache(heuristic, args.cache_size)
+        heuristic = cache
+
+    domain_cache = DomainCache(args.domain_cache or None) if args.domain_cache is not None else None
+    prob = PlanningProblem(args.domain, args.problem, helpful_actions=args.helpful,
+                           helpful_fallback=not args.no_fallback, domain_cache=domain_cache)
+    statistics = SearchStatistics()
+    search_args = (prob, heuristic, args.weight if args.search == 'wastar' else 1.0, args.search == 'gbfs', args.lazy,
+                   statistics, budget_from_args(args))
+    plan = profile_call(args.profile, best_first_search, *search_args) if args.profile \
+        else best_first_search(*search_args)
+    if args.metrics:
+        instrumentation = Instrumentation()
+        instrumentation.record_search(statistics)
+        instrumentation.write_json(args.metrics, heuristic=args.heuristic, parse_time=prob.parse_time,
+                                   plan_length=len(plan) if plan is not None else None)
     if plan is not None:
-        print("Plan found with %d actions in %.2f seconds" % (len(plan), elapsed))
+        print("Plan found with %d actions in %.2f seconds" % (len(plan), statistics.elapsed))
     else:
-        print("Could not find a plan in %.2f seconds" % elapsed)
+        print("Could not find a plan in %.2f seconds" % statistics.elapsed)
+    if statistics.exhausted is not None:
+        print("Ran out of %s budget%s" % (statistics.exhausted, ", a plan costs at least %s" % statistics.bound
+                                           if statistics.bound is not None else ""))
+    print("%s in %.3f seconds" % ("Loaded the domain and parsed the problem" if domain_cache is not None
+                                  else "Parsed the domain and problem", prob.parse_time))
     print("Search nodes expanded: %d" % prob.expanded)
+    print("Search: %s" % statistics)
+    if cache is not None:
+        print(cache.get_stats())
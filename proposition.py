@@ -1,21 +1,43 @@
+from id_registry import IdRegistry
+
+_ids = IdRegistry()  # the ids of the propositions created without one, shared by the process
+
+
+def proposition_id(name):
+    """
+    Returns the integer id of the proposition name in the registry of the process, interning the name if it is new.
+    The propositions of a parsed domain get their ids from its parser instead (see PgParser.get_proposition)
+    """
+    return _ids.get(name)
+
+
 class Proposition(object):
     """
     A class for representing propositions.
     Each proposition object has a name and a list of producers,
     that is the actions that have the proposition on their add set.
-    Two propositions are considered equal if they have the same name.
+    Two propositions are considered equal if they have the same name,
+    which is decided by their interned integer id (see PgParser.get_proposition, or proposition_id).
     """
+    __slots__ = ('name', 'id', 'producers')
 
-    def __init__(self, name):
+    def __init__(self, name, prop_id=None):
         """
         Constructor
+        prop_id is the id of the name in the registry of its domain, by default the one of the process
+        (see proposition_id)
         """
         self.name = name  # the name of the proposition as string
+        # integer id of the name, also the bit of the proposition in a bitmask
+        self.id = prop_id if prop_id is not None else proposition_id(name)
         self.producers = []  # list of all possible actions in the layer that have the proposition on their add list
 
     def get_name(self):
         return self.name
 
+    def get_id(self):
+        return self.id
+
     def get_producers(self):
         return self.producers
 
@@ -26,8 +48,8 @@ class Proposition(object):
         self.producers.append(producer)
 
     def __eq__(self, other):
-        return (isinstance(other, self.__class__)
-                and self.name == other.name)
+        return self is other or (isinstance(other, self.__class__)
+                                 and self.id == other.id)
 
     def __str__(self):
         return self.name
@@ -39,4 +61,4 @@ class Proposition(object):
         return self.name < other.name
 
     def __hash__(self):
-        return hash(self.name)
+        return self.id
@@ -1,10 +1,11 @@
-from util import Pair
+from mutex_set import MutexSet
 
 
 class PropositionLayer(object):
     """
     A class for an PropositionLayer  in a level of the graph.
-    The layer contains a set of propositions (Proposition objects) and a set of mutex propositions (Pair objects)
+    The layer contains a set of propositions (Proposition objects)
+    and a set of mutex propositions (a MutexSet of proposition pairs)
     """
 
     def __init__(self):
@@ -13,7 +14,7 @@ class PropositionLayer(object):
         """
         self.propositions = set()
         # set of all the propositions in the layer
-        self.mutexPropositions = set()
+        self.mutexPropositions = MutexSet()
         # set of pairs of propositions that are mutex in the layer
 
     def add_proposition(self, proposition):
@@ -30,14 +31,14 @@ class PropositionLayer(object):
 
     def add_mutex_prop(self, p1, p2):
         # adds the pair(p1,p2) to the mutex propositions set
-        self.mutexPropositions.add(Pair(p1, p2))
+        self.mutexPropositions.add_mutex(p1, p2)
 
     """
     returns true if proposition p1 and proposition p2 are mutex at this layer
     """
 
     def is_mutex(self, p1, p2):
-        return Pair(p1, p2) in self.mutexPropositions
+        return self.mutexPropositions.is_mutex(p1, p2)
 
     def get_mutex_props(self):  # returns the mutex propositions set
         return self.mutexPropositions
@@ -52,12 +53,9 @@ class PropositionLayer(object):
             if not (pre in self.propositions):
                 return False
 
-        for i in range(len(action_pre)):
-            for j in range(i + 1, len(action_pre)):
-                pre1 = action_pre[i]
-                pre2 = action_pre[j]
-                if Pair(pre1, pre2) in self.mutexPropositions:
-                    return False
+        for pre in action_pre:
+            if self.mutexPropositions.get_mask(pre) & action.pre_mask:
+                return False
 
         return True
 
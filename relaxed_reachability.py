@@ -0,0 +1,157 @@
+import heapq
+from collections import defaultdict
+
+
+class RelaxedReachability(object):
+    """
+    The delete relaxation of a domain (actions without their delete lists), for heuristic evaluation.
+    For a state, compute() returns the relaxed cost of every reachable proposition:
+    h_max, where an action costs 1 + the maximal cost of its preconditions,
+    which is the first level of the proposition in a relaxed planning graph (a graph without mutexes),
+    or h_add, where an action costs 1 + the sum of the costs of its preconditions.
+    relaxed_plan() extracts an FF relaxed plan from the h_max best supporters,
+    together with the helpful actions of the state.
+    Both are computed in a single generalized Dijkstra pass over the propositions:
+    each action keeps a counter of its unsatisfied preconditions and is applied when the counter reaches 0,
+    so no layer objects are created and every action is looked at once per precondition.
+    """
+
+    def __init__(self, actions):
+        """
+        Constructor
+        actions are the actions of the domain, noOps are skipped since they never add a new proposition
+        """
+        self.actions = [action for action in actions if not action.is_noop()]
+        self.pre_counts = [len(action.pre_set) for action in self.actions]  # number of (distinct) preconditions
+        self.adds = [[prop.id for prop in action.add_set] for action in self.actions]
+        consumers = defaultdict(list)  # prop id: indices of the actions that have it as a precondition
+        for i, action in enumerate(self.actions):
+            for prop in action.pre_set:
+                consumers[prop.id].append(i)
+        self.consumers = dict(consumers)
+        producers = defaultdict(list)  # prop id: indices of the actions that add it
+        for i, action in enumerate(self.actions):
+            for prop in action.add_set:
+                producers[prop.id].append(i)
+        self.producers = dict(producers)
+        self.no_pre = [i for i, count in enumerate(self.pre_counts) if count == 0]
+
+    def compute(self, state_ids, goal_ids=None, additive=False, achievers=None):
+        """
+        Returns a dict from the id of every proposition that is reachable from the state
+        (the ids of its propositions) to its h_max cost, or to its h_add cost if additive is true.
+        If goal_ids is given, stops as soon as the cost of all of them is known.
+        If achievers is a dict, it is filled with the index of the cheapest producer (best supporter)
+        of every reached proposition that is not in the state
+        """
+        costs = dict()  # prop id: final cost
+        best = dict()  # prop id: lowest cost pushed to the queue so far
+        if achievers is None:
+            achievers = dict()
+        remaining = set(goal_ids) if goal_ids is not None else None
+        counters = list(self.pre_counts)
+        action_costs = [0] * len(self.actions)
+        queue = []
+        for prop_id in state_ids:
+            best[prop_id] = 0
+            queue.append((0, prop_id))
+        for i in self.no_pre:
+            self.push_adds(i, 1, best, achievers, queue)
+        heapq.heapify(queue)
+        while queue:
+            cost, prop_id = heapq.heappop(queue)
+            if prop_id in costs:
+                continue
+            costs[prop_id] = cost
+            if remaining is not None:
+                remaining.discard(prop_id)
+                if not remaining:
+                    break
+            for i in self.consumers.get(prop_id, ()):
+                if additive:
+                    action_costs[i] += cost
+                elif cost > action_costs[i]:
+                    action_costs[i] = cost
+                counters[i] -= 1
+                if counters[i] == 0:
+                    self.push_adds(i, action_costs[i] + 1, best, achievers, queue)
+        return costs
+
+    def push_adds(self, i, cost, best, achievers, queue):
+        """
+        Pushes the positive effects of the action of index i with the given cost, if it improves on their best cost
+        """
+        for prop_id in self.adds[i]:
+            if cost < best.get(prop_id, float('inf')):
+                best[prop_id] = cost
+                achievers[prop_id] = i
+                heapq.heappush(queue, (cost, prop_id))
+
+    def relaxed_plan(self, state_ids, goal_ids):
+        """
+        Returns (plan, helpful), where plan is the list of the actions of an FF relaxed plan for the goals,
+        or None if a goal is unreachable, and helpful is the bitset of the ids of the helpful actions:
+        the actions applicable in the state that add a sub-goal of the relaxed plan of cost 1.
+        The plan is extracted backwards from the goals: each open sub-goal is achieved by its best supporter,
+        whose preconditions that are not in the state become sub-goals
+        """
+        achievers = dict()
+        costs = self.compute(state_ids, goal_ids, achievers=achievers)
+        if any(goal_id not in costs for goal_id in goal_ids):
+            return None, 0
+        plan = []
+        in_plan = set()  # indices of the actions of the plan
+        helpful = 0
+        open_goals = [goal_id for goal_id in goal_ids if costs[goal_id] > 0]
+        seen = set(open_goals)
+        while open_goals:
+            prop_id = open_goals.pop()
+            if costs[prop_id] == 1:
+                for i in self.producers[prop_id]:
+                    if all(costs.get(pre.id) == 0 for pre in self.actions[i].pre_set):
+                        helpful |= 1 << self.actions[i].id
+            i = achievers[prop_id]
+            if i in in_plan:
+                continue
+            in_plan.add(i)
+            plan.append(self.actions[i])
+            for pre in self.actions[i].pre_set:
+                if costs[pre.id] > 0 and pre.id not in seen:
+                    seen.add(pre.id)
+                    open_goals.append(pre.id)
+        return plan, helpful
+
+    def max_level(self, state_ids, goal_ids):
+        """
+        Returns the first level in which all the goals appear in the relaxed planning graph, or inf
+        """
+        costs = self.compute(state_ids, goal_ids)
+        return max((costs.get(goal_id, float('inf')) for goal_id in goal_ids), default=0)
+
+    def level_sum(self, state_ids, goal_ids):
+        """
+        Returns the sum of the first levels in which the goals appear in the relaxed planning graph, or inf
+        """
+        costs = self.compute(state_ids, goal_ids)
+        return sum(costs.get(goal_id, float('inf')) for goal_id in goal_ids)
+
+    def additive_cost(self, state_ids, goal_ids):
+        """
+        Returns the sum of the h_add costs of the goals, or inf
+        """
+        costs = self.compute(state_ids, goal_ids, additive=True)
+        return sum(costs.get(goal_id, float('inf')) for goal_id in goal_ids)
+
+
+def state_ids(state):
+    """
+    Returns the ids of the propositions of a state, a set of propositions or a bitmask (see PlanningProblem)
+    """
+    if isinstance(state, int):
+        ids = []
+        while state:
+            low_bit = state & -state
+            ids.append(low_bit.bit_length() - 1)
+            state ^= low_bit
+        return ids
+    return [prop.id for prop in state]
@@ -0,0 +1,222 @@
+import heapq
+import time
+from itertools import count
+
+import util
+from budget import SolveResult
+
+
+class SearchProblem:
+    """
+    The interface of a problem for the search functions of this module (see planning_problem.PlanningProblem).
+    States must be hashable
+    """
+
+    def get_start_state(self):
+        """
+        Returns the start state of the search problem
+        """
+        util.raise_not_defined()
+
+    def is_goal_state(self, state):
+        """
+        Returns true if state is a goal state
+        """
+        util.raise_not_defined()
+
+    def get_successors(self, state):
+        """
+        Returns a list of triples (successor, action, step_cost)
+        """
+        util.raise_not_defined()
+
+    def get_cost_of_actions(self, actions):
+        """
+        Returns the total cost of a sequence of actions
+        """
+        util.raise_not_defined()
+
+
+class SearchStatistics(object):
+    """
+    Counters of a search, filled by best_first_search when given one
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.expanded = 0  # states whose successors were generated
+        self.generated = 0  # successors generated
+        self.evaluated = 0  # calls to the heuristic
+        self.reopened = 0  # closed states reached again with a lower cost
+        self.elapsed = 0.0  # seconds
+        self.heuristic_time = 0.0  # seconds spent in the heuristic
+        self.successor_time = 0.0  # seconds spent in problem.get_successors
+        self.exhausted = None  # the limit of the Budget that stopped the search (see Budget.reasons), if any
+        self.bound = None  # when the budget stopped A*, a lower bound on the cost of a plan
+
+    def nodes_per_second(self):
+        return self.expanded / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self):
+        return {'expanded': self.expanded, 'generated': self.generated, 'evaluated': self.evaluated,
+                'reopened': self.reopened, 'elapsed': self.elapsed, 'heuristic_time': self.heuristic_time,
+                'successor_time': self.successor_time, 'nodes_per_second': self.nodes_per_second(),
+                'exhausted': self.exhausted, 'bound': self.bound}
+
+    def __str__(self):
+        return "%d expanded, %d generated, %d evaluated, %d reopened, %.0f nodes/sec " \
+               "(%.3f seconds in the heuristic, %.3f seconds generating successors)" % (
+                   self.expanded, self.generated, self.evaluated, self.reopened, self.nodes_per_second(),
+                   self.heuristic_time, self.successor_time)
+
+
+def null_heuristic(state, problem=None):
+    return 0
+
+
+def a_star_search(problem, heuristic=null_heuristic, statistics=None):
+    """
+    Returns the list of actions of a cheapest plan from the start state of problem to a goal state,
+    or None if there is none (given an admissible heuristic, heuristic(state, problem)).
+    See best_first_search
+    """
+    return best_first_search(problem, heuristic, statistics=statistics)
+
+
+def weighted_a_star_search(problem, heuristic=null_heuristic, weight=2.0, statistics=None, lazy=False):
+    """
+    A* with f = g + weight * h, the cost of the plan is at most weight times the optimal cost
+    (given an admissible heuristic). See best_first_search
+    """
+    return best_first_search(problem, heuristic, weight=weight, statistics=statistics, lazy=lazy)
+
+
+def greedy_best_first_search(problem, heuristic=null_heuristic, statistics=None, lazy=False):
+    """
+    Expands the state of lowest heuristic value first, ignoring the cost of the path to it.
+    See best_first_search
+    """
+    return best_first_search(problem, heuristic, greedy=True, statistics=statistics, lazy=lazy)
+
+
+def best_first_search(problem, heuristic=null_heuristic, weight=1.0, greedy=False, lazy=False, statistics=None,
+                      budget=None):
+    """
+    Returns the list of actions of a plan from the start state of problem to a goal state, or None if there is none.
+    States are expanded in the order of f = g + weight * h (A* for weight 1), or of f = h if greedy is true.
+    The open list is a heap of (f, h, insertion order, g, state) entries, so ties on f are broken
+    in favor of the lower h (the deeper node) and then in FIFO order, which makes the search deterministic.
+    Each state is stored once, with its best g value and a parent pointer (parent state, action),
+    and the plan is rebuilt from the parent pointers when a goal is popped.
+    A state reached again with a lower g is updated and pushed again, even if it was already closed
+    (reopened, which may only happen with an inconsistent heuristic); the entries it leaves in the heap are skipped.
+    The greedy search never pushes a state twice, since the cost of the path does not change its priority.
+    The heuristic is evaluated once per state, and a state of infinite heuristic value is never expanded.
+    If lazy is true the evaluation is deferred: a successor is pushed with the heuristic value of its parent,
+    and is evaluated only when it is popped, so the successors that are never popped are never evaluated.
+    The time spent in the heuristic and in get_successors is added to statistics.
+    If a Budget is given, each expansion is charged to it, and the search stops (returning None) when it runs out,
+    with the reason in statistics.exhausted. For A* (weight 1, evaluated eagerly) the f value of the next state
+    to expand is then a lower bound on the cost of a plan (given an admissible heuristic), kept in statistics.bound
+    """
+    if statistics is None:
+        statistics = SearchStatistics()
+    start_time = time.time()
+    if budget is not None:
+        budget.start()
+    tie = count()
+    infinity = float('inf')
+    perf_counter = time.perf_counter
+
+    def evaluate(evaluated_state):
+        value = h_values.get(evaluated_state)
+        if value is None:
+            evaluation_start = perf_counter()
+            value = heuristic(evaluated_state, problem)
+            statistics.heuristic_time += perf_counter() - evaluation_start
+            h_values[evaluated_state] = value
+            statistics.evaluated += 1
+        return value
+
+    def priority(g_value, h_value):
+        return h_value if greedy else g_value + weight * h_value
+
+    start = problem.get_start_state()
+    h_values = dict()  # state: heuristic value
+    g_values = {start: 0}  # state: cost of the cheapest path found to it
+    parents = {start: None}  # state: (parent state, action), None for the start state
+    closed = set()
+    start_h = 0 if lazy else evaluate(start)
+    open_list = []
+    if start_h != infinity:
+        open_list.append((priority(0, start_h), start_h, next(tie), 0, start))
+    plan = None
+    while open_list:
+        f, _, _, g, state = heapq.heappop(open_list)
+        if g > g_values[state] or state in closed:
+            continue  # an outdated entry
+        if budget is not None and not budget.charge():
+            statistics.exhausted = budget.exhausted
+            if weight == 1.0 and not greedy and not lazy:
+                statistics.bound = f
+            break
+        h = evaluate(state)
+        if h == infinity:
+            closed.add(state)  # a dead end
+            continue
+        if problem.is_goal_state(state):
+            plan = extract_plan(parents, state)
+            break
+        closed.add(state)
+        statistics.expanded += 1
+        successors_start = perf_counter()
+        successors = problem.get_successors(state)
+        statistics.successor_time += perf_counter() - successors_start
+        for successor, action, step_cost in successors:
+            statistics.generated += 1
+            successor_g = g + step_cost
+            if greedy and successor in g_values:
+                continue
+            if successor_g >= g_values.get(successor, infinity):
+                continue
+            if successor in closed:
+                closed.discard(successor)
+                statistics.reopened += 1
+            g_values[successor] = successor_g
+            parents[successor] = (state, action)
+            successor_h = h if lazy else evaluate(successor)
+            if successor_h != infinity:
+                heapq.heappush(open_list, (priority(successor_g, successor_h), successor_h, next(tie), successor_g,
+                                           successor))
+    statistics.elapsed = time.time() - start_time
+    return plan
+
+
+def extract_plan(parents, state):
+    """
+    Returns the actions on the path from the start state to state, following the parent pointers
+    """
+    plan = []
+    while parents[state] is not None:
+        state, action = parents[state]
+        plan.append(action)
+    plan.reverse()
+    return plan
+
+
+def budgeted_search(problem, heuristic=null_heuristic, budget=None, weight=1.0, greedy=False, lazy=False):
+    """
+    Runs best_first_search under budget, and returns a SolveResult (see budget.py) with the plan,
+    or with the lower bound on the cost of a plan and the counters of the search if the budget ran out
+    """
+    statistics = SearchStatistics()
+    plan = best_first_search(problem, heuristic, weight, greedy, lazy, statistics, budget)
+    if plan is not None:
+        status = 'solved'
+    elif statistics.exhausted is not None:
+        status = 'exhausted'
+    else:
+        status = 'unsolvable'
+    return SolveResult(status, plan, statistics.bound, statistics.exhausted, statistics.to_dict())
@@ -0,0 +1,80 @@
+class SuccessorGenerator(object):
+    """
+    A decision tree over the preconditions of the actions, that returns the actions applicable in a state
+    (in the style of the successor generator of Fast Downward).
+    The preconditions of each action are sorted by proposition id, and a node at depth k of the tree
+    holds the actions whose preconditions are all tested on the path to it (immediate),
+    and a child for each proposition that is the k-th precondition of some remaining action.
+    A lookup only descends into the children of the propositions that hold in the state,
+    so its cost depends on the number of applicable actions instead of on the number of actions.
+    NoOps are skipped, they are only used by the planning graph
+    """
+
+    def __init__(self, actions):
+        """
+        Constructor
+        """
+        entries = [(sorted(action.pre_set, key=lambda prop: prop.id), action)
+                   for action in actions if not action.is_noop()]
+        self.root = GeneratorNode(entries, 0)
+        self.size = len(entries)
+
+    def get_applicable(self, state):
+        """
+        Returns the actions applicable in state, a set of propositions or a bitmask over the proposition ids
+        """
+        applicable = []
+        if isinstance(state, int):
+            self.root.collect_mask(state, applicable)
+        else:
+            self.root.collect(state, applicable)
+        return applicable
+
+    def __len__(self):
+        return self.size
+
+
+class GeneratorNode(object):
+    """
+    A node of a SuccessorGenerator
+    """
+    __slots__ = ('immediate', 'children')
+
+    def __init__(self, entries, depth):
+        """
+        Constructor
+        entries are (sorted preconditions, action) pairs whose first depth preconditions were already tested
+        """
+        self.immediate = []  # the actions with exactly depth preconditions
+        groups = dict()  # Proposition: the entries whose precondition at depth is that proposition
+        for pre, action in entries:
+            if len(pre) == depth:
+                self.immediate.append(action)
+            else:
+                groups.setdefault(pre[depth], []).append((pre, action))
+        self.children = {prop: GeneratorNode(group, depth + 1) for prop, group in groups.items()}
+
+    def collect(self, state, applicable):
+        """
+        Appends the actions of the subtree that are applicable in state, a set of propositions
+        """
+        applicable.extend(self.immediate)
+        children = self.children
+        if len(children) <= len(state):
+            for prop, child in children.items():
+                if prop in state:
+                    child.collect(state, applicable)
+        else:
+            for prop in state:
+                child = children.get(prop)
+                if child is not None:
+                    child.collect(state, applicable)
+
+    def collect_mask(self, state, applicable):
+        """
+        Appends the actions of the subtree that are applicable in state, a bitmask over the proposition ids
+        """
+        applicable.extend(self.immediate)
+        for prop, child in self.children.items():
+            if state >> prop.id & 1:
+                child.collect_mask(state, applicable)
@@ -0,0 +1,19 @@
+import pytest
+
+from batch import load_context
+from hanoi import create_lifted_domain_file
+
+
+def test_lifted_domain_has_no_context(tmp_path):
+    domain_file = str(tmp_path / 'domain.txt')
+    create_lifted_domain_file(domain_file, 3, 3)
+    assert load_context(domain_file) is None
+
+
+def test_other_domain_errors_are_raised(tmp_path):
+    domain_file = str(tmp_path / 'domain.txt')
+    with open(domain_file, 'w') as f:
+        f.write("Propositions:\n\nTypes:\nobject: a b\nActions:\n"
+                "Schema: Move(?x) ?y:object\nPre: AT(?x)\nAdd: DONE(?x)\nDel: AT(?x)\n")
+    with pytest.raises(ValueError, match='undeclared parameter'):
+        load_context(domain_file)
@@ -0,0 +1,14 @@
+from budget import Budget, memory_usage
+
+
+def test_memory_is_read_on_the_first_charge():
+    budget = Budget(memory_limit=1).start()
+    assert not budget.charge()
+    assert budget.exhausted == 'memory'
+
+
+def test_memory_is_read_every_interval():
+    budget = Budget(memory_limit=memory_usage() * 100, memory_interval=10).start()
+    for _ in range(25):
+        assert budget.charge()
+    assert budget.next_memory_check == 31  # read at the nodes 1, 11 and 21
@@ -0,0 +1,42 @@
+import os
+import stat
+
+from domain_cache import DomainCache
+from domain_context import DomainContext
+from graph_plan import GraphPlan
+from hanoi import create_domain_file, create_lifted_domain_file, create_problem_file
+from planning_problem import PlanningProblem
+
+
+def test_lifted_domain_is_parsed_with_its_problem(tmp_path):
+    domain_file, problem_file = str(tmp_path / 'domain.txt'), str(tmp_path / 'problem.txt')
+    create_lifted_domain_file(domain_file, 3, 3)
+    create_problem_file(problem_file, 3, 3)
+    cache = DomainCache(str(tmp_path / 'cache'))
+    assert cache.load_grounded(domain_file) is None
+    with GraphPlan(domain_file, problem_file, domain_cache=cache) as gp:
+        assert gp.solve().status == 'solved'
+    assert len(PlanningProblem(domain_file, problem_file, domain_cache=cache).actions) == len(gp.actions)
+
+
+def test_compiled_domain_has_the_mode_of_a_new_file(tmp_path):
+    domain_file = str(tmp_path / 'domain.txt')
+    create_domain_file(domain_file, 3, 3)
+    cache = DomainCache(str(tmp_path / 'cache'))
+    cache.load_grounded(domain_file).close()
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(cache.get_path(domain_file)).st_mode) == 0o666 & ~umask
+
+
+def test_context_is_read_before_the_compiled_domain_is_closed(tmp_path):
+    domain_file = str(tmp_path / 'domain.txt')
+    create_domain_file(domain_file, 3, 3)
+    cache = DomainCache(str(tmp_path / 'cache'))
+    parsed = DomainContext.load(domain_file)
+    for _ in range(2):  # compiled, then loaded from the cache
+        context = DomainContext.load(domain_file, cache)
+        assert len(context.independent_actions.rows) == len(context.actions)
+        assert [context.independent_actions.get_mask(action) for action in context.actions] == \
+            [parsed.independent_actions.get_mask(action) for action in parsed.actions]
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,40 @@
+import pytest
+
+from graph_plan import GraphPlan, same_level
+from hanoi import create_domain_file, create_problem_file
+
+
+@pytest.fixture(params=['dwr', 'hanoi_4_3'])
+def problem(request, tmp_path):
+    """
+    The domain and problem files of a problem whose graph has several levels before a plan is extracted
+    """
+    if request.param == 'dwr':
+        return 'dwrDomain.txt', 'dwrProblem.txt'
+    domain_file, problem_file = str(tmp_path / 'domain.txt'), str(tmp_path / 'problem.txt')
+    create_domain_file(domain_file, 4, 3)
+    create_problem_file(problem_file, 4, 3)
+    return domain_file, problem_file
+
+
+def producer_ids(level):
+    """
+    Returns a dict proposition id: the ids of its producers, over the propositions of level
+    """
+    action_layer = level.get_action_layer()
+    return {prop.id: {action.id for action in action_layer.get_producers(prop)}
+            for prop in level.get_proposition_layer().get_propositions()}
+
+
+@pytest.mark.parametrize('expansion', ['incremental', 'leveled', 'numpy'])
+def test_expansion_matches_full_expansion(problem, expansion):
+    if expansion == 'numpy':
+        pytest.importorskip('numpy')
+    full = GraphPlan(*problem, expansion='full', extraction='first')
+    full.solve()
+    gp = GraphPlan(*problem, expansion=expansion, extraction='first')
+    gp.solve()
+    assert len(gp.graph) == len(full.graph)
+    for level, (expected, actual) in enumerate(zip(full.graph, gp.graph)):
+        assert same_level(actual, expected), level
+        assert producer_ids(actual) == producer_ids(expected), level
@@ -0,0 +1,72 @@
+import pytest
+
+from budget import Budget
+from graph_plan import GraphPlan
+from hanoi import create_domain_file, create_problem_file
+
+
+@pytest.fixture
+def hanoi_4_3(tmp_path):
+    """
+    The domain and problem files of the towers of Hanoi with 4 disks and 3 pegs
+    """
+    domain_file, problem_file = str(tmp_path / 'domain.txt'), str(tmp_path / 'problem.txt')
+    create_domain_file(domain_file, 4, 3)
+    create_problem_file(problem_file, 4, 3)
+    return domain_file, problem_file
+
+
+@pytest.fixture
+def pigeonhole(tmp_path):
+    """
+    The domain and problem files of putting 3 pigeons in 2 holes, which is unsolvable
+    although no two of the goals are mutex
+    """
+    pigeons, holes = range(3), range(2)
+    domain_file, problem_file = str(tmp_path / 'domain.txt'), str(tmp_path / 'problem.txt')
+    with open(domain_file, 'w') as f:
+        f.write("Propositions:\n%s %s\n" % (' '.join('free_%d' % h for h in holes),
+                                            ' '.join('placed_%d' % p for p in pigeons)))
+        f.write("Actions:\n")
+        for p in pigeons:
+            for h in holes:
+                f.write("Name: Put_%d_%d\npre: free_%d\nadd: placed_%d\ndelete: free_%d\n" % (p, h, h, p, h))
+    with open(problem_file, 'w') as f:
+        f.write("Initial state: %s\n" % ' '.join('free_%d' % h for h in holes))
+        f.write("Goal state: %s\n" % ' '.join('placed_%d' % p for p in pigeons))
+    return domain_file, problem_file
+
+
+@pytest.mark.parametrize('expansion', GraphPlan.expansions)
+def test_retry_after_exhausted_budget(hanoi_4_3, expansion):
+    if expansion == 'numpy':
+        pytest.importorskip('numpy')
+    gp = GraphPlan(*hanoi_4_3, expansion=expansion, extraction='first')
+    assert gp.solve(Budget(node_limit=200)).status == 'exhausted'
+    result = gp.solve()
+    assert result.status == 'solved'
+    assert len(result.plan) == 15
+
+
+@pytest.mark.parametrize('expansion', GraphPlan.expansions)
+def test_unsolvable_stops_when_no_goods_are_stable(pigeonhole, expansion):
+    if expansion == 'numpy':
+        pytest.importorskip('numpy')
+    gp = GraphPlan(*pigeonhole, expansion=expansion)
+    result = gp.solve(Budget(node_limit=100000))
+    assert result.status == 'unsolvable'
+    assert gp.fixed_level == 2
+    assert len(gp.graph) == 5  # the graph levels off at level 3, and one more level shows the no-goods are stable
+
+
+@pytest.mark.parametrize('expansion', GraphPlan.expansions)
+def test_levels_after_level_off_are_the_level_off_level(pigeonhole, expansion):
+    if expansion == 'numpy':
+        pytest.importorskip('numpy')
+    gp = GraphPlan(*pigeonhole, expansion=expansion)
+    gp.solve()
+    assert gp.fixed_level is not None
+    for level in range(gp.fixed_level + 2, len(gp.graph)):
+        assert gp.graph[level] is gp.graph[gp.fixed_level]
+    for level in range(1, gp.fixed_level + 2):
+        assert gp.graph[level] is not gp.graph[level - 1]
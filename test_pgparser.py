@@ -0,0 +1,46 @@
+import pytest
+
+from action import Action
+from domain_context import DomainContext
+from graph_plan import GraphPlan
+from hanoi import create_domain_file, create_problem_file
+from pgparser import PgParser
+from proposition import Proposition
+
+
+def test_ids_are_dense_per_domain(tmp_path):
+    domain_file, problem_file = str(tmp_path / 'domain.txt'), str(tmp_path / 'problem.txt')
+    create_domain_file(domain_file, 3, 3)
+    create_problem_file(problem_file, 3, 3)
+    for i in range(1000):  # names of other domains do not widen the bitsets of this one
+        Proposition('other_%d' % i)
+        Action('other_%d' % i, [], [], [])
+    GraphPlan('dwrDomain.txt', 'dwrProblem.txt')
+    context = DomainContext.load(domain_file)
+    assert sorted(prop.id for prop in context.propositions) == list(range(len(context.propositions)))
+    assert sorted(action.id for action in context.actions) == list(range(len(context.actions)))
+    assert max(context.independent_actions.get_mask(action) for action in context.actions) < 1 << len(context.actions)
+    gp = GraphPlan(domain_file, problem_file, context=context)
+    assert all(prop is context.propositions[prop.id] for prop in gp.initial_state + gp.goal)
+
+
+def parse_domain(tmp_path, text):
+    domain_file = str(tmp_path / 'domain.txt')
+    with open(domain_file, 'w') as f:
+        f.write(text)
+    actions, _ = PgParser(domain_file, None).parse_actions_and_propositions()
+    return {action.name: [[prop.name for prop in props] for props in (action.pre, action.add, action.delete)]
+            for action in actions}
+
+
+def test_blank_line_in_an_action_is_an_empty_list(tmp_path):
+    actions = parse_domain(tmp_path, "Propositions:\na b\nActions:\n"
+                                     "Name: A1\npre: a\nadd: b\n\n"
+                                     "Name: A2\npre: b\n\ndel: b\n"
+                                     "Name: A3\npre: a\nadd: a\n")
+    assert actions == {'A1': [['a'], ['b'], []], 'A2': [['b'], [], ['b']], 'A3': [['a'], ['a'], []]}
+
+
+def test_action_cut_by_the_next_one_is_an_error(tmp_path):
+    with pytest.raises(ValueError, match='A1 has no add line'):
+        parse_domain(tmp_path, "Propositions:\na b\nActions:\nName: A1\npre: a\nName: A2\npre: b\nadd: a\ndel: b\n")
@@ -18,9 +18,9 @@ class Pair(object):
         self.b = b
 
     def __eq__(self, other):
-        if (self.a == other.a) & (self.b == other.b):
+        if self.a == other.a and self.b == other.b:
             return True
-        if (self.b == other.a) & (self.a == other.b):
+        if self.b == other.a and self.a == other.b:
             return True
         return False
 
@@ -31,7 +31,11 @@ class Pair(object):
         return "(" + str(self.a) + "," + str(self.b) + ")"
 
     def __hash__(self):
-        return hash(self.a) + hash(self.b)
+        # order independent, and unlike hash(a) + hash(b) it does not collide for small integer hashes
+        hash_a, hash_b = hash(self.a), hash(self.b)
+        if hash_a > hash_b:
+            hash_a, hash_b = hash_b, hash_a
+        return hash((hash_a, hash_b))
 
 
 """
@@ -551,7 +555,7 @@ class TimeoutFunctionException(Exception):
 class TimeoutFunction:
 
     def __init__(self, function, timeout):
-        "timeout must be at least 1 second. WHY??"
+        "timeout is in seconds, and may be a fraction of a second (the timer is set with setitimer)"
         self.timeout = timeout
         self.function = function
 
@@ -562,10 +566,10 @@ class TimeoutFunction:
         if 'SIGALRM' not in dir(signal):
             return self.function(*args)
         old = signal.signal(signal.SIGALRM, self.handle_timeout)
-        signal.alarm(self.timeout)
+        signal.setitimer(signal.ITIMER_REAL, self.timeout)
         try:
             result = self.function(*args)
         finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)  # cancel the timer also when the function raises
             signal.signal(signal.SIGALRM, old)
-        signal.alarm(0)
         return result